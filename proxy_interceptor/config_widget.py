@@ -69,6 +69,7 @@ class AppConfig(BaseModel):
     )
     http_proxy_username: str = ""  # Optional proxy username
     http_proxy_password: str = ""  # Optional proxy password
+    max_captured_body_kb: int = 256  # Raw upstream body kept per request (0 = all)
 
     @field_validator("api_keys")
     @classmethod
@@ -94,6 +95,13 @@ class AppConfig(BaseModel):
             raise ValueError("Port must be between 1 and 65535")
         return int(v)
 
+    @field_validator("max_captured_body_kb")
+    @classmethod
+    def validate_max_captured_body_kb(cls, v: int):
+        if int(v) < 0:
+            raise ValueError("Captured body limit cannot be negative")
+        return int(v)
+
 
 def is_port_available(port: int, host: str = "127.0.0.1") -> bool:
     try:
@@ -123,6 +131,7 @@ class ConfigWidget(QWidget):
         self.http_proxy_url = ""
         self.http_proxy_username = ""
         self.http_proxy_password = ""
+        self.max_captured_body_kb = 256
         self._saved_port: int | None = None
         # Store the last saved configuration for comparison
         self._last_saved_config: AppConfig | None = None
@@ -205,6 +214,22 @@ class ConfigWidget(QWidget):
 
         bottom_layout.addWidget(port_group)
 
+        capture_group = QGroupBox("Captured Body Limit")
+        capture_layout = QHBoxLayout(capture_group)
+        capture_layout.setSpacing(INNER_SPACING)
+
+        capture_label = QLabel("KB (0 = no limit):")
+        self.max_body_input = QLineEdit()
+        self.max_body_input.setValidator(QIntValidator(0, 1024 * 1024))
+        self.max_body_input.setText(str(self.max_captured_body_kb))
+        self.max_body_input.textChanged.connect(self._on_config_changed)
+        self.max_body_input.setMaximumWidth(100)
+        capture_layout.addWidget(capture_label)
+        capture_layout.addWidget(self.max_body_input)
+        capture_layout.addStretch()
+
+        bottom_layout.addWidget(capture_group)
+
         # HTTP Proxy configuration group
         proxy_group = QGroupBox("HTTP Proxy (Optional)")
         proxy_layout = QVBoxLayout(proxy_group)
@@ -358,6 +383,7 @@ class ConfigWidget(QWidget):
                 auth_tokens=set(self.auth_tokens),
                 port=int(self.port),
                 auto_restart_enabled=self.auto_restart_enabled,
+                max_captured_body_kb=int(self.max_captured_body_kb),
             )
 
             requires_restart = self._config_requires_restart(temp_config)
@@ -443,6 +469,12 @@ class ConfigWidget(QWidget):
         else:
             self.port = 8080
 
+        max_body_text = self.max_body_input.text()
+        if max_body_text:
+            self.max_captured_body_kb = int(max_body_text)
+        else:
+            self.max_captured_body_kb = 256
+
         # Parse proxy fields
         self.http_proxy_url = self.proxy_url_input.text().strip()
         self.http_proxy_username = self.proxy_username_input.text().strip()
@@ -455,6 +487,7 @@ class ConfigWidget(QWidget):
         - API keys (added, removed, or modified)
         - Models (added, removed, or reordered)
         - Port number
+        - HTTP proxy settings or captured body limit
         """
         if self._last_saved_config is None:
             # First time saving, no restart needed
@@ -489,6 +522,12 @@ class ConfigWidget(QWidget):
             logger.info("Proxy settings changed, restart required")
             return True
 
+        if old_config.max_captured_body_kb != new_config.max_captured_body_kb:
+            logger.info(
+                f"Captured body limit changed from {old_config.max_captured_body_kb} KB to {new_config.max_captured_body_kb} KB, restart required"
+            )
+            return True
+
         logger.debug("No configuration changes requiring restart detected")
         return False
 
@@ -506,6 +545,7 @@ class ConfigWidget(QWidget):
                     http_proxy_url=self.http_proxy_url,
                     http_proxy_username=self.http_proxy_username,
                     http_proxy_password=self.http_proxy_password,
+                    max_captured_body_kb=int(self.max_captured_body_kb),
                 )
             except ValidationError as ve:
                 self.status.emit(
@@ -582,6 +622,7 @@ class ConfigWidget(QWidget):
                 self.http_proxy_url = cfg.http_proxy_url
                 self.http_proxy_username = cfg.http_proxy_username
                 self.http_proxy_password = cfg.http_proxy_password
+                self.max_captured_body_kb = cfg.max_captured_body_kb
                 self._saved_port = self.port
                 # Store loaded config as the baseline for comparison
                 self._last_saved_config = cfg
@@ -604,6 +645,7 @@ class ConfigWidget(QWidget):
                 self.http_proxy_url = loaded.get("http_proxy_url", "")
                 self.http_proxy_username = loaded.get("http_proxy_username", "")
                 self.http_proxy_password = loaded.get("http_proxy_password", "")
+                self.max_captured_body_kb = int(loaded.get("max_captured_body_kb", 256))
                 self._saved_port = self.port
 
             self._update_ui()
@@ -622,6 +664,7 @@ class ConfigWidget(QWidget):
             self.http_proxy_url = ""
             self.http_proxy_username = ""
             self.http_proxy_password = ""
+            self.max_captured_body_kb = 256
             self._update_ui()
             logger.info("No configuration file found, using defaults")
             logger.debug(
@@ -646,6 +689,8 @@ class ConfigWidget(QWidget):
         self.api_keys_text.textChanged.disconnect()
         with contextlib.suppress(Exception):
             self.port_input.textChanged.disconnect()
+        with contextlib.suppress(Exception):
+            self.max_body_input.textChanged.disconnect()
 
         masked_keys = [self._mask_api_key(key) for key in self.api_keys]
         self.api_keys_text.setPlainText("\n".join(masked_keys))
@@ -662,6 +707,7 @@ class ConfigWidget(QWidget):
 
         try:
             self.port_input.setText(str(int(self.port)))
+            self.max_body_input.setText(str(int(self.max_captured_body_kb)))
             # Update auto-restart checkbox state
             if hasattr(self, "auto_restart_checkbox") and hasattr(
                 self.auto_restart_checkbox, "setChecked"
@@ -678,6 +724,7 @@ class ConfigWidget(QWidget):
         finally:
             self.api_keys_text.textChanged.connect(self._on_config_changed)
             self.port_input.textChanged.connect(self._on_config_changed)
+            self.max_body_input.textChanged.connect(self._on_config_changed)
 
     def get_api_keys(self) -> list[str]:
         return self.api_keys.copy()
@@ -688,6 +735,9 @@ class ConfigWidget(QWidget):
     def get_port(self) -> int:
         return int(self.port)
 
+    def get_max_captured_body_bytes(self) -> int:
+        return int(self.max_captured_body_kb) * 1024
+
     def has_valid_config(self) -> bool:
         return len(self.api_keys) > 0 and len(self.api_models) > 0
 
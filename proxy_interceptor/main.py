@@ -39,10 +39,16 @@ class SanitizingFormatter(logging.Formatter):
         return redacted
 
     def format(self, record: logging.LogRecord) -> str:
-        original_msg = record.getMessage()
-        record.message = self.sanitize(original_msg)
-        formatted = super().format(record)
-        return self.sanitize(formatted)
+        # The console and file handlers share this formatter, so the sanitized
+        # text is cached on the record like logging caches exc_text
+        cached = getattr(record, "_sanitized_text", None)
+        if cached is not None:
+            return cached
+        # Formatter.format() recomputes record.message itself, so a single pass
+        # over the formatted text covers the message and any traceback
+        formatted = self.sanitize(super().format(record))
+        record._sanitized_text = formatted
+        return formatted
 
 
 def setup_logging():
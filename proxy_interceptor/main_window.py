@@ -67,6 +67,16 @@ class InterceptBridge(QObject):
     streaming_update = pyqtSignal(object)
 
 
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create the proxy event loop, using uvloop where it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not available, using the default asyncio event loop")
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
 class AsyncRunner(QThread):
     loop_ready = pyqtSignal(object)
     proxy_started = pyqtSignal()
@@ -84,7 +94,7 @@ class AsyncRunner(QThread):
 
     def run(self):
         logger.info("Starting async event loop thread")
-        self.loop = asyncio.new_event_loop()
+        self.loop = _new_event_loop()
         asyncio.set_event_loop(self.loop)
 
         self.loop.call_soon_threadsafe(lambda: self.loop_ready.emit(self.loop))
@@ -126,6 +136,7 @@ class AsyncRunner(QThread):
             cfg_proxy_url = main_window.config_widget.http_proxy_url
             cfg_proxy_username = main_window.config_widget.http_proxy_username
             cfg_proxy_password = main_window.config_widget.http_proxy_password
+            cfg_max_body = main_window.config_widget.get_max_captured_body_bytes()
             try:
                 from proxy_interceptor.config_widget import is_port_available
 
@@ -146,6 +157,7 @@ class AsyncRunner(QThread):
                     http_proxy_url=cfg_proxy_url,
                     http_proxy_username=cfg_proxy_username,
                     http_proxy_password=cfg_proxy_password,
+                    max_captured_body_bytes=cfg_max_body,
                 )
                 self.proxy_server = ProxyServer(
                     config,
@@ -160,6 +172,7 @@ class AsyncRunner(QThread):
                 self.proxy_server.config.http_proxy_url = cfg_proxy_url
                 self.proxy_server.config.http_proxy_username = cfg_proxy_username
                 self.proxy_server.config.http_proxy_password = cfg_proxy_password
+                self.proxy_server.config.max_captured_body_bytes = cfg_max_body
 
             await self.proxy_server.start()
             self.proxy_started.emit()
@@ -422,10 +435,14 @@ class MainWindow(QMainWindow):
             self.async_runner.proxy_started.connect(self._on_proxy_started)
             self.async_runner.proxy_stopped.connect(self._on_proxy_stopped)
             self.async_runner.proxy_error.connect(self._on_proxy_error)
+            # Emitted from the proxy loop thread; queue explicitly so the
+            # handlers always run on the GUI thread and never block the proxy
             self.async_runner.bridge.request_intercepted.connect(
-                self._on_request_intercepted
+                self._on_request_intercepted, Qt.ConnectionType.QueuedConnection
+            )
+            self.async_runner.bridge.streaming_update.connect(
+                self._on_streaming_update, Qt.ConnectionType.QueuedConnection
             )
-            self.async_runner.bridge.streaming_update.connect(self._on_streaming_update)
             self.async_runner._start_requested = True
             self.toggle_proxy_btn.setEnabled(False)
             self.toggle_proxy_btn.setText("Starting...")
@@ -521,7 +538,10 @@ class MainWindow(QMainWindow):
         ):
             self.request_details_widget.update_streaming_content(intercepted)
 
-        # Update model tracking for streaming updates
+        # Model stats only change once the stream completes; refreshing them
+        # on every delta copied and rescanned the whole history each time
+        if not intercepted.response.streaming_complete:
+            return
         try:
             all_requests = self.request_list_widget.get_all_requests()
             self.config_widget.update_model_tracking(all_requests)
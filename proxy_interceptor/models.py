@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -42,22 +43,23 @@ class ModelInvocation:
         ]
 
 
-@dataclass
+@dataclass(slots=True)
 class HttpRequest:
     timestamp: datetime
     method: str
     url: str
-    headers: dict[str, str]
+    headers: Mapping[str, str]
     body: str
 
 
-@dataclass
+@dataclass(slots=True)
 class HttpResponse:
     status_code: int
     status_text: str
-    headers: dict[str, str]
+    headers: Mapping[str, str]
     body: str
     raw_body: str = ""
+    raw_body_size: int = 0
     latency_ms: float | None = None
     prompt_tokens: int | None = None
     completion_tokens: int | None = None
@@ -74,6 +76,13 @@ class InterceptedRequest:
     model_invocations: list[ModelInvocation] = field(default_factory=list)
     primary_model: str | None = None
     fallback_models_used: list[str] = field(default_factory=list)
+    # Redacted header text, filled in by the details view on first display
+    request_headers_text: str | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    response_headers_text: str | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def get_successful_model(self) -> str | None:
         """Get the model that successfully handled this request."""
@@ -1,16 +1,19 @@
 import asyncio
 import contextlib
-import json
 import logging
+import re
+import sys
 from collections import deque
 from collections.abc import Callable
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from time import perf_counter
 
 import httpx
+import orjson
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 
 from proxy_interceptor.models import (
     HttpRequest,
@@ -22,6 +25,45 @@ from proxy_interceptor.models import (
 
 logger = logging.getLogger(__name__)
 
+# Imported directly (rather than named as a string) so bundlers pick it up.
+# The module imports httptools itself, so where that has no wheel the server
+# falls back to uvicorn's pure-Python h11 protocol
+try:
+    from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol as _HttpProtocol
+except ImportError:
+    logger.info("httptools not available, serving with the h11 protocol")
+    _HttpProtocol = "h11"
+
+# Upstream headers relayed on streaming responses (lowercase, as raw bytes).
+# Not content-encoding: httpx decodes the body, and the upstream encoding was
+# negotiated by httpx rather than by the proxy's client. Framing headers such
+# as content-length and transfer-encoding are left to the ASGI server.
+_STREAM_PASSTHROUGH_HEADERS = (b"content-type", b"cache-control")
+_SSE_DATA_PREFIX = b"data:"
+_SSE_DONE_PAYLOAD = b"[DONE]"
+# Matches the payload of every complete "data:" line in an SSE buffer; the
+# space after the colon is optional per the SSE spec
+_SSE_DATA_RE = re.compile(rb"(?m)^" + re.escape(_SSE_DATA_PREFIX) + rb" ?(.+?)\r?$")
+# Static banner served on "/", encoded once
+_ROOT_BODY = orjson.dumps({
+    "message": "OpenRouter Proxy Interceptor is running. Use POST /v1/chat/completions and GET /v1/models."
+})
+# Upstream failures tied to the API key rather than the model, so trying the
+# remaining models cannot succeed. Not 403: OpenRouter also returns it when a
+# moderated model flags the input, which another model may well accept
+_KEY_ERROR_STATUSES = frozenset({401, 402})
+# Upstream error bodies are only quoted in log lines, so reading stops here
+_ERROR_BODY_LIMIT = 2048
+# Seconds to wait on a models list fetch before racing it with the next key
+_MODELS_HEDGE_DELAY = 0.2
+# Minimum seconds between intermediate streaming updates sent to the UI
+_STREAM_UPDATE_INTERVAL = 0.05
+
+
+def _elapsed_ms(started: float) -> float:
+    """Milliseconds elapsed since a perf_counter() reading."""
+    return (perf_counter() - started) * 1000.0
+
 
 @dataclass
 class ProxyConfig:
@@ -30,6 +72,8 @@ class ProxyConfig:
     target_base_url: str = "https://openrouter.ai/api/v1"
     log_requests: bool = True
     max_requests: int = 1000
+    # Upper bound on the upstream body kept per intercepted request (0 = no limit)
+    max_captured_body_bytes: int = 256 * 1024
 
     openrouter_api_keys: list[str] = None
     openrouter_api_models: list[str] = None
@@ -41,11 +85,17 @@ class ProxyConfig:
     http_proxy_username: str = ""
     http_proxy_password: str = ""
 
+    # Derived from target_base_url once instead of per request
+    chat_completions_url: str = field(init=False, default="")
+    models_url: str = field(init=False, default="")
+
     def __post_init__(self):
         if self.openrouter_api_keys is None:
             self.openrouter_api_keys = []
         if self.openrouter_api_models is None:
             self.openrouter_api_models = []
+        self.chat_completions_url = f"{self.target_base_url}/chat/completions"
+        self.models_url = f"{self.target_base_url}/models"
         try:
             if (
                 not self.site_url
@@ -73,6 +123,8 @@ class ProxyServer:
             title="OpenRouter Proxy Interceptor",
             description="A proxy that intercepts OpenRouter requests with key rotation and retry logic.",
         )
+        # deque.append/clear are atomic under the GIL, so no lock is needed even
+        # when the UI thread reads the history while the event loop appends to it.
         self.intercepted_requests: deque[InterceptedRequest] = deque(
             maxlen=int(self.config.max_requests)
         )
@@ -82,174 +134,422 @@ class ProxyServer:
         self.on_intercept = on_intercept
         self.on_streaming_update = on_streaming_update
 
+        # UI callbacks are queued and delivered by a worker task, outside the
+        # request path. Only intermediate streaming updates count toward the
+        # bound; intercepts and final updates are never dropped.
+        self._ui_queue: deque[tuple] = deque()
+        self._ui_queue_limit = 1024
+        self._ui_queue_ready = asyncio.Event()
+        self._ui_worker_task: asyncio.Task | None = None
+        # Requests with an intermediate streaming update already queued; the
+        # request object is updated in place, so one queued update suffices
+        self._ui_pending_updates: set[int] = set()
+
+        # Round-robin cursors; they are read and advanced without an await in
+        # between, so the single-threaded event loop needs no lock for them
         self._current_key_index = 0
-        self._key_lock = asyncio.Lock()
-
         self._current_model_index = 0
-        self._model_lock = asyncio.Lock()
 
         self._client = None
+        self._key_headers: list[dict[str, str]] = []
+        self._prepare_upstream()
 
         logger.info("Initializing ProxyServer")
         self._setup_middleware()
         self._setup_routes()
         logger.info("ProxyServer routes configured")
 
-    async def _get_next_key_index(self) -> int:
-        async with self._key_lock:
-            if not self.config.openrouter_api_keys:
-                raise HTTPException(
-                    status_code=503, detail="No OpenRouter API keys configured"
-                )
-            idx = self._current_key_index
-            self._current_key_index = (self._current_key_index + 1) % len(
-                self.config.openrouter_api_keys
+    def _prepare_upstream(self):
+        """Pre-build the upstream headers for each configured API key."""
+        common = {
+            "Content-Type": "application/json",
+            "HTTP-Referer": self.config.site_url,
+            "X-Title": self.config.app_name,
+        }
+        self._key_headers = [
+            {"Authorization": f"Bearer {key}", **common}
+            for key in self.config.openrouter_api_keys
+        ]
+
+    def _get_next_key_index(self) -> int:
+        if not self.config.openrouter_api_keys:
+            raise HTTPException(
+                status_code=503, detail="No OpenRouter API keys configured"
             )
-            return idx
+        num_keys = len(self.config.openrouter_api_keys)
+        idx = self._current_key_index % num_keys
+        self._current_key_index = (idx + 1) % num_keys
+        return idx
 
-    async def _get_next_model_index(self) -> int:
-        async with self._model_lock:
-            if not self.config.openrouter_api_models:
-                raise HTTPException(
-                    status_code=503, detail="No OpenRouter API models configured"
-                )
-            idx = self._current_model_index
-            self._current_model_index = (self._current_model_index + 1) % len(
-                self.config.openrouter_api_models
+    def _get_next_model_index(self) -> int:
+        if not self.config.openrouter_api_models:
+            raise HTTPException(
+                status_code=503, detail="No OpenRouter API models configured"
             )
-            return idx
-
-    def _extract_content_from_chunk(self, chunk_text: str) -> str:
-        """Extract content from a streaming chunk."""
-        content_parts = []
-        for line in chunk_text.split("\n"):
-            if line.startswith("data: ") and not line.startswith("data: [DONE]"):
-                json_data = line[6:]
-                if json_data.strip():
-                    try:
-                        data = json.loads(json_data)
-                        if "choices" in data and len(data["choices"]) > 0:
-                            delta = data["choices"][0].get("delta", {})
-                            content = delta.get("content", "")
-                            if content:
-                                content_parts.append(content)
-                    except (json.JSONDecodeError, KeyError, IndexError):
-                        continue
-        return "".join(content_parts)
-
-    def _process_chunk_content(
+        num_models = len(self.config.openrouter_api_models)
+        idx = self._current_model_index % num_models
+        self._current_model_index = (idx + 1) % num_models
+        return idx
+
+    def _notify_ui(
         self,
-        chunk: bytes,
-        extracted_content: list[str],
+        callback: Callable[[InterceptedRequest], None] | None,
         intercepted_request: InterceptedRequest,
-    ) -> bool:
-        """Process chunk content and return whether it had content."""
+        must_deliver: bool = False,
+    ):
+        """Queue a UI callback without blocking the request path."""
+        if callback is None:
+            return
+        if not must_deliver:
+            if id(intercepted_request) in self._ui_pending_updates:
+                return
+            self._ui_pending_updates.add(id(intercepted_request))
+        if len(self._ui_queue) >= self._ui_queue_limit:
+            # Intermediate streaming updates are superseded by later ones, so
+            # evict the oldest of those to make room
+            for i, (_, queued, queued_must_deliver) in enumerate(self._ui_queue):
+                if not queued_must_deliver:
+                    del self._ui_queue[i]
+                    self._ui_pending_updates.discard(id(queued))
+                    logger.debug("UI callback queue full; dropped a streaming update")
+                    break
+            else:
+                if not must_deliver:
+                    self._ui_pending_updates.discard(id(intercepted_request))
+                    logger.debug("UI callback queue full; dropping streaming update")
+                    return
+                # Only undeliverable entries are queued: let the queue grow
+                logger.warning(
+                    f"UI callback queue holds {len(self._ui_queue)} pending updates"
+                )
+        self._ui_queue.append((callback, intercepted_request, must_deliver))
+        self._ui_queue_ready.set()
+
+    def _drain_ui_queue(self):
+        """Deliver every queued UI callback in order."""
+        while self._ui_queue:
+            callback, intercepted_request, must_deliver = self._ui_queue.popleft()
+            if not must_deliver:
+                self._ui_pending_updates.discard(id(intercepted_request))
+            try:
+                callback(intercepted_request)
+            except Exception:
+                logger.exception("Error in UI callback")
+
+    async def _ui_worker(self):
+        """Deliver queued UI callbacks whenever new ones arrive.
+
+        The callbacks only emit Qt signals, which are thread-safe and return
+        immediately, so they run on the loop rather than hopping to a thread.
+        """
+        while True:
+            await self._ui_queue_ready.wait()
+            self._ui_queue_ready.clear()
+            self._drain_ui_queue()
+
+    def _start_ui_worker(self):
+        if self._ui_worker_task is None or self._ui_worker_task.done():
+            self._ui_worker_task = asyncio.create_task(self._ui_worker())
+            logger.debug("Started UI callback worker")
+
+    async def _stop_ui_worker(self):
+        if self._ui_worker_task and not self._ui_worker_task.done():
+            self._ui_worker_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._ui_worker_task
+        self._ui_worker_task = None
+        # Deliver whatever was still queued, such as final streaming updates
+        self._drain_ui_queue()
+        logger.debug("Stopped UI callback worker")
+
+    def _extract_delta_content(self, payload: bytes) -> str:
+        """Extract the delta content from a single SSE data payload."""
+        # Shape checks instead of catching KeyError & co: content-less chunks
+        # (role headers, usage, finish reasons) are common and must not raise
         try:
-            chunk_text = chunk.decode("utf-8")
-            content = self._extract_content_from_chunk(chunk_text)
+            data = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            return ""
+        choices = data.get("choices") if isinstance(data, dict) else None
+        if not choices or not isinstance(choices, list):
+            return ""
+        choice = choices[0]
+        delta = choice.get("delta") if isinstance(choice, dict) else None
+        if not isinstance(delta, dict):
+            return ""
+        return delta.get("content") or ""
+
+    def _extract_sse_content(
+        self, sse_buffer: bytearray, extracted_content: list[str]
+    ) -> bool:
+        """Consume complete SSE lines from the buffer and collect their content.
+
+        Incomplete trailing lines stay in the buffer until the next chunk arrives,
+        so events split across chunks (or mid UTF-8 sequence) are not lost.
+        """
+        end = sse_buffer.rfind(b"\n")
+        if end == -1:
+            return False
+        # Scan the buffer in place up to the last newline, then drop that prefix
+        payloads = _SSE_DATA_RE.findall(sse_buffer, 0, end)
+        del sse_buffer[: end + 1]
+        return self._extract_payload_content(payloads, extracted_content)
+
+    def _extract_payload_content(
+        self, payloads: list[bytes], extracted_content: list[str]
+    ) -> bool:
+        """Collect the delta content of SSE data payloads."""
+        had_content = False
+        for payload in payloads:
+            if payload == _SSE_DONE_PAYLOAD:
+                continue
+            content = self._extract_delta_content(payload)
             if content:
                 extracted_content.append(content)
-                return True
-        except UnicodeDecodeError:
-            pass
-        return False
+                had_content = True
+        return had_content
 
     def _update_streaming_response(
         self, intercepted_request: InterceptedRequest, extracted_content: list[str]
     ):
         """Update the streaming response with current content."""
-        intercepted_request.response.streaming_content = "".join(extracted_content)
+        content = "".join(extracted_content)
+        # Keep a single joined piece so the next join only copies new deltas once
+        extracted_content[:] = [content]
+        intercepted_request.response.streaming_content = content
         intercepted_request.response.is_streaming = True
         intercepted_request.response.streaming_complete = False
 
-        if self.on_streaming_update:
-            try:
-                self.on_streaming_update(intercepted_request)
-            except Exception:
-                logger.exception("Error in streaming update callback")
+        self._notify_ui(self.on_streaming_update, intercepted_request)
 
     def _finalize_streaming_response(
         self,
         intercepted_request: InterceptedRequest,
-        captured_chunks: list[bytes],
+        raw: bytes,
+        raw_size: int,
         extracted_content: list[str],
+        started: float,
     ):
         """Finalize the streaming response after all chunks are processed."""
         try:
-            full_content = b"".join(captured_chunks).decode("utf-8")
-            intercepted_request.response.raw_body = full_content
+            response = intercepted_request.response
+            self._capture_raw_body(response, raw, raw_size)
 
             if extracted_content:
                 readable_content = "".join(extracted_content)
-                intercepted_request.response.body = readable_content
-                intercepted_request.response.streaming_content = readable_content
+                response.body = readable_content
+                response.streaming_content = readable_content
                 logger.debug(
-                    f"Captured {len(full_content)} characters of raw SSE data and extracted {len(readable_content)} characters of readable content"
+                    f"Captured {response.raw_body_size} bytes of raw SSE data and extracted {len(readable_content)} characters of readable content"
                 )
             else:
-                intercepted_request.response.body = full_content
-                intercepted_request.response.streaming_content = full_content
+                # Same bounded text as raw_body, marker included when truncated
+                response.body = response.raw_body
+                response.streaming_content = response.raw_body
                 logger.debug(
-                    f"Captured {len(full_content)} characters of raw streaming response (no extracted content)"
+                    f"Captured {response.raw_body_size} bytes of raw streaming response (no extracted content)"
                 )
 
             intercepted_request.response.is_streaming = False
             intercepted_request.response.streaming_complete = True
 
-            self._calculate_response_latency(intercepted_request)
+            intercepted_request.response.latency_ms = _elapsed_ms(started)
 
-            if self.on_streaming_update:
-                try:
-                    self.on_streaming_update(intercepted_request)
-                except Exception:
-                    logger.exception("Error in final streaming update callback")
+            self._notify_ui(
+                self.on_streaming_update, intercepted_request, must_deliver=True
+            )
 
         except Exception:
             logger.exception("Error capturing streaming content")
 
-    def _calculate_response_latency(self, intercepted_request: InterceptedRequest):
-        """Calculate and set the response latency."""
+    def _capture_raw_body(
+        self, http_response: HttpResponse, raw: bytes, raw_size: int | None = None
+    ):
+        """Store a size-bounded, decoded copy of the upstream body on the response.
+
+        `raw_size` is the full body size when `raw` is only its captured prefix.
+        """
+        limit = self.config.max_captured_body_bytes
+        if raw_size is None:
+            raw_size = len(raw)
+        http_response.raw_body_size = raw_size
+        if 0 < limit < raw_size:
+            http_response.raw_body = (
+                raw[:limit].decode("utf-8", errors="replace")
+                + f"...[truncated {raw_size - limit} bytes]"
+            )
+        else:
+            http_response.raw_body = raw.decode("utf-8", errors="replace")
+
+    async def _read_error_body(self, api_response: httpx.Response) -> str:
+        """Read a bounded prefix of a streamed error body, then close it."""
+        chunks = []
+        size = 0
         try:
-            start_ts = intercepted_request.request.timestamp
-            intercepted_request.response.latency_ms = (
-                datetime.now() - start_ts
-            ).total_seconds() * 1000.0
-        except Exception as e:
-            logger.debug(f"Error calculating latency: {e}")
+            async for chunk in api_response.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= _ERROR_BODY_LIMIT:
+                    break
+        finally:
+            await api_response.aclose()
+        body = b"".join(chunks)
+        text = body[:_ERROR_BODY_LIMIT].decode("utf-8", errors="replace")
+        if size > _ERROR_BODY_LIMIT:
+            text += "...[truncated]"
+        return text
+
+    def _cap_text(self, text: str) -> str:
+        """Bound a formatted body to the captured body limit, in characters."""
+        limit = self.config.max_captured_body_bytes
+        if 0 < limit < len(text):
+            return text[:limit] + f"...[truncated {len(text) - limit} chars]"
+        return text
+
+    async def _stream_passthrough(self, api_response: httpx.Response):
+        """Relay streaming response chunks without capturing anything."""
+        # Decoded rather than raw: content-encoding is not relayed, since the
+        # upstream encoding was negotiated by httpx, not by the proxy's client
+        try:
+            async for chunk in api_response.aiter_bytes():
+                yield chunk
+        except Exception:
+            logger.exception("Error while streaming response")
+        finally:
+            await api_response.aclose()
 
     async def _stream_response_generator(
         self,
         api_response: httpx.Response,
-        intercepted_request: InterceptedRequest = None,
+        intercepted_request: InterceptedRequest,
+        started: float,
     ):
         """Generate streaming response chunks while capturing content."""
         captured_chunks = []
+        # Bytes relayed so far; chunks are only kept up to the capture limit
+        relayed_size = 0
+        capture_limit = self.config.max_captured_body_bytes or sys.maxsize
         extracted_content = []
+        sse_buffer = bytearray()
+        # Without a streaming subscriber, content is extracted once at the end
+        # from the capture, unless the stream outgrows it
+        incremental = self.on_streaming_update is not None
+        scanning = incremental
+        # Joining the content so far is O(total), so updates are rate limited
+        next_update = 0.0
+        # No chunk_size: httpcore already reads up to 64 KiB per socket read,
+        # and a chunk_size makes httpx hold data back until it fills, which
+        # would delay tokens reaching the client
+        chunks = api_response.aiter_bytes()
 
         try:
-            async for chunk in api_response.aiter_bytes():
-                if intercepted_request:
+            if not scanning:
+                async for chunk in chunks:
                     captured_chunks.append(chunk)
-                    chunk_had_content = self._process_chunk_content(
-                        chunk, extracted_content, intercepted_request
+                    relayed_size += len(chunk)
+                    yield chunk
+                    if relayed_size > capture_limit:
+                        # The capture will not hold the whole stream, so scan
+                        # what it has and extract the rest as it arrives
+                        sse_buffer += b"".join(captured_chunks)
+                        self._extract_sse_content(sse_buffer, extracted_content)
+                        scanning = True
+                        break
+            if scanning:
+                async for chunk in chunks:
+                    if relayed_size < capture_limit:
+                        captured_chunks.append(chunk)
+                    relayed_size += len(chunk)
+                    sse_buffer += chunk
+                    # Relay first so parsing never sits between upstream and client
+                    yield chunk
+                    chunk_had_content = self._extract_sse_content(
+                        sse_buffer, extracted_content
                     )
-
-                    if chunk_had_content:
+                    if (
+                        incremental
+                        and chunk_had_content
+                        and perf_counter() >= next_update
+                    ):
                         self._update_streaming_response(
                             intercepted_request, extracted_content
                         )
+                        next_update = perf_counter() + _STREAM_UPDATE_INTERVAL
 
-                yield chunk
-
+        except asyncio.CancelledError:
+            logger.info("Client disconnected while streaming response")
+            raise
         except Exception:
             logger.exception("Error while streaming response")
         finally:
-            if intercepted_request and captured_chunks:
+            if captured_chunks:
+                # Join once; the same bytes feed the SSE scan and the capture.
+                # "$" also matches at the end, so a final unterminated line counts.
+                raw = b"".join(captured_chunks)
+                captured_chunks.clear()
+                payloads = _SSE_DATA_RE.findall(sse_buffer if scanning else raw)
+                sse_buffer.clear()
+                self._extract_payload_content(payloads, extracted_content)
                 self._finalize_streaming_response(
-                    intercepted_request, captured_chunks, extracted_content
+                    intercepted_request, raw, relayed_size, extracted_content, started
                 )
+                extracted_content.clear()
+            # Releases the upstream connection even when the client went away
             await api_response.aclose()
 
+    async def _fetch_models(self) -> httpx.Response:
+        """Fetch the models list, hedging across API keys.
+
+        The list is the same for every key, so a slow first key is raced
+        against the next one, and a failed key falls through to the rest.
+        """
+        keys = iter(self._key_headers)
+        tasks: list[asyncio.Task] = []
+        pending: set[asyncio.Task] = set()
+        last_response: httpx.Response | None = None
+        last_error: Exception | None = None
+
+        def try_next_key():
+            headers = next(keys, None)
+            if headers is not None:
+                task = asyncio.create_task(
+                    self._client.get(self.config.models_url, headers=headers)
+                )
+                tasks.append(task)
+                pending.add(task)
+
+        try_next_key()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=_MODELS_HEDGE_DELAY,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Still waiting: hedge with one more key at a time
+                    if len(pending) < 2:
+                        try_next_key()
+                    continue
+                for task in done:
+                    try:
+                        response = task.result()
+                    except httpx.RequestError as e:
+                        last_error = e
+                    else:
+                        if response.is_success:
+                            return response
+                        last_response = response
+                    try_next_key()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
     def _setup_middleware(self):
         logger.debug("Setting up FastAPI middleware")
 
@@ -276,25 +576,41 @@ class ProxyServer:
         logger.debug("Setting up FastAPI routes")
 
         # ruff: noqa: C901
-        @self.app.post("/v1/chat/completions")
-        async def chat_completions(request: Request):
-            logger.info("Received chat completions request")
+        async def chat_completions(request: Request) -> Response:
+            # Arrival and outcome are logged by the timing middleware
+            received_at = datetime.now()
+            started = perf_counter()
 
             try:
-                request_data = await request.json()
-            except json.JSONDecodeError as e:
+                request_data = orjson.loads(await request.body())
+            except orjson.JSONDecodeError as e:
                 raise HTTPException(status_code=400, detail="Invalid JSON body") from e
 
             is_streaming = request_data.get("stream", False)
 
-            key_index = await self._get_next_key_index()
-            api_key = self.config.openrouter_api_keys[key_index]
+            key_index = self._get_next_key_index()
+            headers = self._key_headers[key_index]
+            target_url = self.config.chat_completions_url
 
             current_model_index = self._current_model_index
             last_error_status = 500
             last_error_detail = "All API models failed."
             num_models = len(self.config.openrouter_api_models)
 
+            # Built once, and only when it will be logged; only the body
+            # changes between model attempts
+            http_request = None
+            if self.config.log_requests:
+                # Positional: timestamp, method, url, headers, body
+                http_request = HttpRequest(
+                    received_at,
+                    request.method,
+                    str(request.url),
+                    # Header objects are kept as read-only views, not copied
+                    request.headers,
+                    "",
+                )
+
             # Track all model invocations for this request
             model_invocations = []
             primary_model = None
@@ -305,11 +621,14 @@ class ProxyServer:
                 model_name = self.config.openrouter_api_models[model_index]
 
                 # Create model invocation tracking
+                attempt_started = perf_counter()
                 model_invocation = ModelInvocation(
                     model_name=model_name,
                     model_version=None,  # OpenRouter doesn't provide version info
                     status=ModelProcessStatus.IN_PROGRESS,
-                    timestamp=datetime.now(),
+                    # Offset the single wall-clock reading by the monotonic delta
+                    timestamp=received_at
+                    + timedelta(seconds=attempt_started - started),
                     api_key_index=key_index,
                     model_index=model_index,
                     retry_count=i,
@@ -323,33 +642,19 @@ class ProxyServer:
 
                 request_data["model"] = model_name
 
-                body_str = json.dumps(request_data)
+                # Serialized once: sent upstream as bytes and logged as text
+                body_bytes = orjson.dumps(request_data)
+                if http_request is not None:
+                    http_request.body = body_bytes.decode()
 
-                http_request = HttpRequest(
-                    timestamp=datetime.now(),
-                    method=request.method,
-                    url=str(request.url),
-                    headers=dict(request.headers),
-                    body=body_str,
-                )
-
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": self.config.site_url,
-                    "X-Title": self.config.app_name,
-                }
-
-                logger.info(
+                logger.debug(
                     f"Attempting request with API key index {key_index}, model '{model_name}' (model index {model_index}) (Stream: {is_streaming})"
                 )
 
                 try:
-                    target_url = f"{self.config.target_base_url}/chat/completions"
-
                     if is_streaming:
                         req = self._client.build_request(
-                            "POST", target_url, json=request_data, headers=headers
+                            "POST", target_url, content=body_bytes, headers=headers
                         )
                         api_response = await self._client.send(req, stream=True)
 
@@ -360,93 +665,93 @@ class ProxyServer:
 
                             # Update model invocation status to success
                             model_invocation.status = ModelProcessStatus.SUCCESS
-                            model_invocation.latency_ms = (
-                                datetime.now() - model_invocation.timestamp
-                            ).total_seconds() * 1000.0
+                            model_invocation.latency_ms = _elapsed_ms(attempt_started)
+
+                            stream_headers = {
+                                name.decode("latin-1"): value.decode("latin-1")
+                                for name, value in api_response.headers.raw
+                                if name.lower() in _STREAM_PASSTHROUGH_HEADERS
+                            }
+                            if http_request is None:
+                                # Logging is off: relay without buffering anything
+                                return StreamingResponse(
+                                    self._stream_passthrough(api_response),
+                                    media_type="text/event-stream",
+                                    headers=stream_headers,
+                                )
 
+                            # The placeholder is only needed for the UI
                             http_response = HttpResponse(
-                                status_code=api_response.status_code,
-                                status_text=api_response.reason_phrase,
-                                headers=dict(api_response.headers),
-                                body="[Streaming in progress...]",
-                                raw_body="[Streaming in progress...]",
+                                api_response.status_code,
+                                api_response.reason_phrase,
+                                api_response.headers,
+                                "[Streaming in progress...]",
+                                "[Streaming in progress...]",
                                 is_streaming=True,
-                                streaming_content="",
-                                streaming_complete=False,
                             )
-
-                            if self.config.log_requests:
-                                intercepted = InterceptedRequest(
-                                    request=http_request,
-                                    response=http_response,
-                                    model_invocations=model_invocations.copy(),
-                                    primary_model=primary_model,
-                                    fallback_models_used=fallback_models_used.copy(),
-                                )
-                                self.intercepted_requests.append(intercepted)
-                                if self.on_intercept:
-                                    try:
-                                        self.on_intercept(intercepted)
-                                    except Exception:
-                                        logger.exception(
-                                            "Error in on_intercept callback for streaming response"
-                                        )
+                            intercepted = InterceptedRequest(
+                                request=http_request,
+                                response=http_response,
+                                model_invocations=model_invocations.copy(),
+                                primary_model=primary_model,
+                                fallback_models_used=fallback_models_used.copy(),
+                            )
+                            self.intercepted_requests.append(intercepted)
+                            self._notify_ui(
+                                self.on_intercept, intercepted, must_deliver=True
+                            )
 
                             return StreamingResponse(
                                 self._stream_response_generator(
-                                    api_response, intercepted
+                                    api_response, intercepted, started
                                 ),
                                 media_type="text/event-stream",
-                                headers={
-                                    k: v
-                                    for k, v in api_response.headers.items()
-                                    if k.lower() in ["content-type", "content-encoding"]
-                                },
+                                headers=stream_headers,
                             )
 
                         elif api_response.status_code == 429:
                             error_detail = f"Rate limit exceeded for API key index {key_index}, model '{model_name}' (index {model_index})"
                             try:
-                                error_body = await api_response.aread()
-                                error_detail += f" Response: {error_body.decode()}"
+                                error_body = await self._read_error_body(api_response)
+                                error_detail += f" Response: {error_body}"
                             except Exception:
                                 logger.debug("Failed to read error response body")
-                            await api_response.aclose()
                             logger.warning(error_detail)
 
                             # Update model invocation status to rate limited
                             model_invocation.status = ModelProcessStatus.RATE_LIMITED
                             model_invocation.error_message = error_detail
-                            model_invocation.latency_ms = (
-                                datetime.now() - model_invocation.timestamp
-                            ).total_seconds() * 1000.0
+                            model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
                             last_error_status = 429
                             last_error_detail = error_detail
                         else:
-                            error_body = await api_response.aread()
-                            error_detail = f"Error with API key index {key_index}, model '{model_name}' (index {model_index}): Status {api_response.status_code}, Response: {error_body.decode()}"
-                            await api_response.aclose()
+                            error_body = await self._read_error_body(api_response)
+                            error_detail = f"Error with API key index {key_index}, model '{model_name}' (index {model_index}): Status {api_response.status_code}, Response: {error_body}"
                             logger.error(error_detail)
 
                             # Update model invocation status to failed
                             model_invocation.status = ModelProcessStatus.FAILED
                             model_invocation.error_message = error_detail
-                            model_invocation.latency_ms = (
-                                datetime.now() - model_invocation.timestamp
-                            ).total_seconds() * 1000.0
+                            model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
                             last_error_status = api_response.status_code
                             last_error_detail = error_detail
-                            if i == num_models - 1:
+                            if (
+                                i == num_models - 1
+                                or last_error_status in _KEY_ERROR_STATUSES
+                            ):
                                 raise HTTPException(
                                     status_code=last_error_status,
                                     detail=last_error_detail,
                                 )
                     else:
-                        api_response = await self._client.post(
-                            target_url, json=request_data, headers=headers
+                        # Sent as a stream so error bodies can be read bounded;
+                        # a successful body is read whole below
+                        req = self._client.build_request(
+                            "POST", target_url, content=body_bytes, headers=headers
                         )
+                        api_response = await self._client.send(req, stream=True)
 
                         if api_response.status_code == 200:
                             logger.info(
@@ -455,68 +760,58 @@ class ProxyServer:
 
                             # Update model invocation status to success
                             model_invocation.status = ModelProcessStatus.SUCCESS
-                            model_invocation.latency_ms = (
-                                datetime.now() - model_invocation.timestamp
-                            ).total_seconds() * 1000.0
+                            model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
-                            raw_text = api_response.text
                             try:
-                                parsed_json = api_response.json()
-
-                                extracted_content = ""
-                                if (
-                                    "choices" in parsed_json
-                                    and len(parsed_json["choices"]) > 0
-                                ):
-                                    choice = parsed_json["choices"][0]
-                                    if (
-                                        "message" in choice
-                                        and "content" in choice["message"]
-                                    ):
-                                        extracted_content = choice["message"]["content"]
-
-                                if extracted_content:
-                                    formatted_body = extracted_content
+                                raw_content = await api_response.aread()
+                            finally:
+                                await api_response.aclose()
+                            # The response is only parsed when it will be logged
+                            if http_request is not None:
+                                try:
+                                    parsed_json = orjson.loads(raw_content)
+                                except orjson.JSONDecodeError:
+                                    parsed_json = None
+
+                                usage = {}
+                                if isinstance(parsed_json, dict):
+                                    usage = parsed_json.get("usage") or {}
+                                    extracted_content = ""
+                                    choices = parsed_json.get("choices")
+                                    if choices and isinstance(choices[0], dict):
+                                        message = choices[0].get("message") or {}
+                                        extracted_content = message.get("content") or ""
+
+                                    if extracted_content:
+                                        formatted_body = extracted_content
+                                    else:
+                                        formatted_body = self._cap_text(
+                                            orjson.dumps(
+                                                parsed_json, option=orjson.OPT_INDENT_2
+                                            ).decode()
+                                        )
                                 else:
-                                    formatted_body = json.dumps(parsed_json, indent=2)
-                            except (json.JSONDecodeError, ValueError):
-                                formatted_body = raw_text
-
-                            try:
-                                start_ts = http_request.timestamp
-                                latency_ms = (
-                                    datetime.now() - start_ts
-                                ).total_seconds() * 1000.0
-                            except Exception:
-                                latency_ms = None
-
-                            http_response = HttpResponse(
-                                status_code=api_response.status_code,
-                                status_text=api_response.reason_phrase,
-                                headers=dict(api_response.headers),
-                                body=formatted_body,
-                                raw_body=raw_text,
-                                latency_ms=latency_ms,
-                            )
-
-                            try:
-                                usage = (
-                                    parsed_json.get("usage", {})
-                                    if isinstance(parsed_json, dict)
-                                    else {}
-                                )
-                                http_response.prompt_tokens = usage.get("prompt_tokens")
-                                http_response.completion_tokens = usage.get(
-                                    "completion_tokens"
+                                    formatted_body = self._cap_text(
+                                        raw_content.decode("utf-8", errors="replace")
+                                    )
+
+                                latency_ms = _elapsed_ms(started)
+
+                                http_response = HttpResponse(
+                                    status_code=api_response.status_code,
+                                    status_text=api_response.reason_phrase,
+                                    headers=api_response.headers,
+                                    body=formatted_body,
+                                    latency_ms=latency_ms,
+                                    prompt_tokens=usage.get("prompt_tokens"),
+                                    completion_tokens=usage.get("completion_tokens"),
+                                    total_tokens=usage.get("total_tokens"),
                                 )
-                                http_response.total_tokens = usage.get("total_tokens")
+                                self._capture_raw_body(http_response, raw_content)
 
                                 # Update model invocation with token usage
                                 model_invocation.tokens_used = usage.get("total_tokens")
-                            except Exception as e:
-                                logger.debug(f"Error extracting token usage: {e}")
 
-                            if self.config.log_requests:
                                 intercepted = InterceptedRequest(
                                     request=http_request,
                                     response=http_response,
@@ -525,53 +820,60 @@ class ProxyServer:
                                     fallback_models_used=fallback_models_used.copy(),
                                 )
                                 self.intercepted_requests.append(intercepted)
-                                if self.on_intercept:
-                                    try:
-                                        self.on_intercept(intercepted)
-                                    except Exception:
-                                        logger.exception(
-                                            "Error in on_intercept callback for non-streaming response"
-                                        )
+                                self._notify_ui(
+                                    self.on_intercept, intercepted, must_deliver=True
+                                )
 
-                            return JSONResponse(
-                                content=api_response.json(),
+                            # Relay the upstream bytes as-is instead of re-encoding them
+                            return Response(
+                                content=raw_content,
                                 status_code=api_response.status_code,
+                                media_type=api_response.headers.get(
+                                    "content-type", "application/json"
+                                ),
                             )
 
                         elif api_response.status_code == 429:
                             error_detail = f"Rate limit exceeded for API key index {key_index}, model '{model_name}' (index {model_index})"
-                            with contextlib.suppress(Exception):
-                                error_detail += f" Response: {api_response.text}"
+                            try:
+                                error_body = await self._read_error_body(api_response)
+                                error_detail += f" Response: {error_body}"
+                            except Exception:
+                                logger.debug("Failed to read error response body")
                             logger.warning(error_detail)
 
                             # Update model invocation status to rate limited
                             model_invocation.status = ModelProcessStatus.RATE_LIMITED
                             model_invocation.error_message = error_detail
-                            model_invocation.latency_ms = (
-                                datetime.now() - model_invocation.timestamp
-                            ).total_seconds() * 1000.0
+                            model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
                             last_error_status = 429
                             last_error_detail = error_detail
                         else:
-                            error_detail = f"Error with API key index {key_index}, model '{model_name}' (index {model_index}): Status {api_response.status_code}, Response: {api_response.text}"
+                            error_body = await self._read_error_body(api_response)
+                            error_detail = f"Error with API key index {key_index}, model '{model_name}' (index {model_index}): Status {api_response.status_code}, Response: {error_body}"
                             logger.error(error_detail)
 
                             # Update model invocation status to failed
                             model_invocation.status = ModelProcessStatus.FAILED
                             model_invocation.error_message = error_detail
-                            model_invocation.latency_ms = (
-                                datetime.now() - model_invocation.timestamp
-                            ).total_seconds() * 1000.0
+                            model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
                             last_error_status = api_response.status_code
                             last_error_detail = error_detail
-                            if i == num_models - 1:
+                            if (
+                                i == num_models - 1
+                                or last_error_status in _KEY_ERROR_STATUSES
+                            ):
                                 raise HTTPException(
                                     status_code=last_error_status,
                                     detail=last_error_detail,
                                 )
 
+                except HTTPException:
+                    # Deliberate failures keep their upstream status
+                    raise
+
                 except httpx.RequestError as e:
                     error_detail = f"HTTPX Request Error with API key index {key_index}, model '{model_name}' (index {model_index}): {e.__class__.__name__} - {e}"
                     logger.exception(error_detail)
@@ -579,9 +881,7 @@ class ProxyServer:
                     # Update model invocation status to failed
                     model_invocation.status = ModelProcessStatus.FAILED
                     model_invocation.error_message = error_detail
-                    model_invocation.latency_ms = (
-                        datetime.now() - model_invocation.timestamp
-                    ).total_seconds() * 1000.0
+                    model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
                     last_error_status = 503
                     last_error_detail = error_detail
@@ -597,9 +897,7 @@ class ProxyServer:
                     # Update model invocation status to failed
                     model_invocation.status = ModelProcessStatus.FAILED
                     model_invocation.error_message = error_detail
-                    model_invocation.latency_ms = (
-                        datetime.now() - model_invocation.timestamp
-                    ).total_seconds() * 1000.0
+                    model_invocation.latency_ms = _elapsed_ms(attempt_started)
 
                     last_error_status = 500
                     last_error_detail = error_detail
@@ -608,15 +906,19 @@ class ProxyServer:
                             status_code=last_error_status, detail=last_error_detail
                         ) from e
 
-            async with self._model_lock:
-                self._current_model_index = (self._current_model_index + 1) % len(
-                    self.config.openrouter_api_models
-                )
+            self._get_next_model_index()
             logger.error(f"All {num_models} API models failed for the request")
             raise HTTPException(
                 status_code=last_error_status, detail=last_error_detail
             ) from None
 
+        # Registered as a plain Starlette route: the handler only takes the raw
+        # request and always returns a Response, so FastAPI's dependency
+        # resolution and response serialization would be pure overhead
+        self.app.router.add_route(
+            "/v1/chat/completions", chat_completions, methods=["POST"]
+        )
+
         @self.app.get("/v1/models")
         async def get_models():
             if not self.config.openrouter_api_keys:
@@ -624,22 +926,17 @@ class ProxyServer:
                     status_code=503, detail="No OpenRouter API keys configured"
                 )
 
-            api_key = self.config.openrouter_api_keys[0]
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "HTTP-Referer": self.config.site_url,
-                "X-Title": self.config.app_name,
-            }
-
             logger.info("Fetching models list from OpenRouter...")
             try:
-                target_url = f"{self.config.target_base_url}/models"
-                response = await self._client.get(target_url, headers=headers)
+                response = await self._fetch_models()
                 response.raise_for_status()
 
                 logger.info("Successfully fetched models list")
-                return JSONResponse(
-                    content=response.json(), status_code=response.status_code
+                # Relay the upstream JSON as-is instead of decoding and re-encoding it
+                return Response(
+                    content=response.content,
+                    status_code=response.status_code,
+                    media_type=response.headers.get("content-type", "application/json"),
                 )
 
             except httpx.HTTPStatusError as e:
@@ -663,9 +960,7 @@ class ProxyServer:
 
         @self.app.get("/")
         async def read_root():
-            return {
-                "message": "OpenRouter Proxy Interceptor is running. Use POST /v1/chat/completions and GET /v1/models."
-            }
+            return Response(content=_ROOT_BODY, media_type="application/json")
 
     async def start(self):
         if self.is_running:
@@ -674,6 +969,9 @@ class ProxyServer:
 
         logger.info(f"Starting proxy server on {self.config.host}:{self.config.port}")
 
+        # Keys and site URL may have changed since the last start
+        self._prepare_upstream()
+
         if not self._client:
             try:
                 timeout = httpx.Timeout(60.0, connect=10.0, read=60.0, write=60.0)
@@ -701,11 +999,22 @@ class ProxyServer:
                     proxy = proxy_url
                 logger.info(f"Configured HTTP proxy: {proxy_url}")
 
-            self._client = httpx.AsyncClient(timeout=timeout, proxy=proxy)
+            # One pooled client for all upstream calls; HTTP/2 multiplexes
+            # concurrent completions over a single TLS connection to OpenRouter
+            limits = httpx.Limits(
+                max_connections=500,
+                max_keepalive_connections=200,
+                keepalive_expiry=60.0,
+            )
+            self._client = httpx.AsyncClient(
+                http2=True, timeout=timeout, limits=limits, proxy=proxy
+            )
             logger.info(
-                f"Initialized upstream HTTP client with timeout={timeout}, proxy={'enabled' if proxy else 'disabled'}"
+                f"Initialized upstream HTTP/2 client with timeout={timeout}, proxy={'enabled' if proxy else 'disabled'}"
             )
 
+        self._start_ui_worker()
+
         attempt = 0
         last_err: Exception | None = None
         backoffs = [0.2, 0.5, 1.0]
@@ -717,30 +1026,25 @@ class ProxyServer:
                     self.app,
                     host=self.config.host,
                     port=self.config.port,
+                    http=_HttpProtocol,
+                    timeout_keep_alive=30,
                     log_level="info",
                     access_log=False,
                 )
                 self.server = uvicorn.Server(config)
                 self.server_task = asyncio.create_task(self.server.serve())
 
-                async def _ready() -> bool:
-                    try:
-                        async with httpx.AsyncClient(timeout=1.0) as probe:
-                            resp = await probe.get(
-                                f"http://{self.config.host}:{self.config.port}/",
-                                headers={"Connection": "close"},
-                            )
-                            return resp.status_code in (200, 404)
-                    except Exception:
-                        return False
-
-                ready_deadline = asyncio.get_event_loop().time() + 3.0
-                while asyncio.get_event_loop().time() < ready_deadline:
-                    if await _ready():
-                        self.is_running = True
-                        logger.info("Proxy server started successfully")
-                        return
-                    await asyncio.sleep(0.05)
+                # uvicorn flips `started` once its socket is listening
+                ready_deadline = perf_counter() + 3.0
+                while not self.server.started and perf_counter() < ready_deadline:
+                    if self.server_task.done():
+                        break
+                    await asyncio.sleep(0.01)
+
+                if self.server.started and await self._accepts_connections():
+                    self.is_running = True
+                    logger.info("Proxy server started successfully")
+                    return
 
                 logger.warning("Uvicorn did not become ready within deadline; retrying")
                 if self.server:
@@ -759,10 +1063,25 @@ class ProxyServer:
                 await asyncio.sleep(backoffs[attempt - 1])
 
         self.is_running = False
+        await self._stop_ui_worker()
         raise RuntimeError(
             f"Failed to start proxy on {self.config.host}:{self.config.port}: {last_err}"
         )
 
+    async def _accepts_connections(self) -> bool:
+        """Confirm the listening socket with a single TCP connect."""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.config.host, self.config.port),
+                timeout=1.0,
+            )
+        except (OSError, TimeoutError):
+            return False
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return True
+
     async def stop(self):
         if not self.is_running or not self.server:
             logger.warning("Proxy server not running")
@@ -774,6 +1093,8 @@ class ProxyServer:
             await self._client.aclose()
             self._client = None
 
+        await self._stop_ui_worker()
+
         if self.server:
             self.server.should_exit = True
 
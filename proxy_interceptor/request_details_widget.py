@@ -1,11 +1,16 @@
 import contextlib
-import json
 import logging
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
 
 import defusedxml.minidom
-from PyQt6.QtCore import Qt, QTimer
+import orjson
+from PyQt6.QtCore import QObject, QRunnable, Qt, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QLabel,
+    QPlainTextEdit,
     QSplitter,
     QTabWidget,
     QTextEdit,
@@ -18,6 +23,104 @@ from proxy_interceptor.models import InterceptedRequest
 
 logger = logging.getLogger(__name__)
 
+# Bodies beyond this many characters are cut before display; the full text
+# stays on the intercepted request
+MAX_DISPLAY_CHARS = 256 * 1024
+# Number of formatted bodies kept so reselecting a request skips formatting
+FORMAT_CACHE_SIZE = 32
+# Bodies at least this long are formatted on a worker thread
+ASYNC_FORMAT_CHARS = 64 * 1024
+# Bounds for the streaming flush interval and the flush durations, in ms,
+# that make it back off or speed up
+MIN_FLUSH_INTERVAL_MS = 33
+MAX_FLUSH_INTERVAL_MS = 250
+SLOW_FLUSH_MS = 10
+FAST_FLUSH_MS = 2
+
+# Closing tags, then non-self-closing opening tags, matched in one pass
+_HTML_TAG_RE = re.compile(r"(</[^>]+>|<[^/>]+[^/]>)")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+# Lowercased names of headers whose values are masked in the details view
+_REDACTED_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "x-api-key"})
+# Longest run of asterisks standing in for the hidden middle of a token
+_MAX_MASK_LENGTH = 64
+
+
+def _cap_for_display(text: str) -> str:
+    if text and len(text) > MAX_DISPLAY_CHARS:
+        return (
+            text[:MAX_DISPLAY_CHARS]
+            + f"\n...[truncated {len(text) - MAX_DISPLAY_CHARS} chars]"
+        )
+    return text
+
+
+def _content_type_of(headers: Mapping[str, str]) -> str:
+    """Return the lowercased content type, looked up once per body."""
+    for key, value in headers.items():
+        if key.lower() == "content-type":
+            return value.lower()
+    return ""
+
+
+def _format_html(html: str) -> str:
+    try:
+        formatted = _HTML_TAG_RE.sub(r"\1\n", html)
+        formatted = _BLANK_LINES_RE.sub("\n", formatted)
+        return formatted.strip()
+    except Exception:
+        return html
+
+
+def _format_body(body: str, content_type: str) -> str:
+    """Pretty-print a body; safe to call off the GUI thread."""
+    if not body or not body.strip():
+        return body
+
+    try:
+        if "application/json" in content_type or "text/json" in content_type:
+            parsed = orjson.loads(body)
+            return orjson.dumps(parsed, option=orjson.OPT_INDENT_2).decode()
+
+        elif "application/xml" in content_type or "text/xml" in content_type:
+            # minidom keeps namespace prefixes, comments and processing
+            # instructions as sent, which ElementTree would rewrite or drop
+            dom = defusedxml.minidom.parseString(body)
+            return dom.toprettyxml(indent="  ")
+
+        elif "text/html" in content_type:
+            return _format_html(body)
+
+        else:
+            return body
+
+    except Exception as e:
+        logger.debug(f"Failed to format body content: {e}")
+        return body
+
+
+class _FormatSignals(QObject):
+    # body, content type, formatted text; passed as objects so large
+    # strings are not copied through QString
+    finished = pyqtSignal(object, object, object)
+
+
+class _FormatJob(QRunnable):
+    """Format one body on a pool thread and report the result by signal."""
+
+    def __init__(self, body: str, content_type: str, signals: _FormatSignals):
+        super().__init__()
+        self._body = body
+        self._content_type = content_type
+        self._signals = signals
+
+    def run(self):
+        formatted = _format_body(self._body, self._content_type)
+        # The widget, and its signals object, may be gone by now
+        with contextlib.suppress(RuntimeError):
+            self._signals.finished.emit(self._body, self._content_type, formatted)
+
 
 class RequestDetailsWidget(QWidget):
     def __init__(self):
@@ -25,10 +128,15 @@ class RequestDetailsWidget(QWidget):
         self.current_request = None
         # Buffer for streaming to avoid full-document replacement per chunk
         self._stream_buffer: str = ""
-        self._last_meta_text: str = ""
+        # Streaming text currently shown, so later flushes append only the tail
+        self._flushed_content: str = ""
+        # Inputs of the response title last shown while streaming
+        self._last_title_key: tuple | None = None
         self._flush_timer = QTimer(self)
         self._flush_timer.setSingleShot(True)
-        self._flush_timer.setInterval(75)  # throttle UI updates (~13 fps)
+        # Throttle UI updates; starts at ~13 fps and adapts to the flush cost
+        self._flush_interval_ms = 75
+        self._flush_timer.setInterval(self._flush_interval_ms)
         self._flush_timer.timeout.connect(self._flush_stream_buffer)
         logger.debug("RequestDetailsWidget initialized with throttled streaming buffer")
 
@@ -39,26 +147,47 @@ class RequestDetailsWidget(QWidget):
         self._pending_update = None
         self._debounce_interval = 200  # ms
 
+        # Formatted bodies of recently shown requests, oldest first, keyed by
+        # body text and content type so an identical replayed body also hits
+        self._format_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        # Raw body waiting to be shown once the Raw tab is opened
+        self._pending_raw: tuple[str, str, str | None] | None = None
+        # Large bodies being formatted on the thread pool, and the format each
+        # editor is waiting for; a later write to an editor cancels its wait
+        self._format_jobs: set[tuple[str, str]] = set()
+        self._awaiting_format: dict[QPlainTextEdit, tuple[str, str]] = {}
+        self._format_signals = _FormatSignals(self)
+        self._format_signals.finished.connect(
+            self._on_body_formatted, Qt.ConnectionType.QueuedConnection
+        )
+
         self._setup_ui()
 
     def _redact_header(self, key: str, value: str) -> str:
         try:
             k = key.lower()
             if k == "authorization":
-                if isinstance(value, str) and value.lower().startswith("bearer "):
+                if isinstance(value, str) and value[:7].lower() == "bearer ":
                     token = value[7:]
                     if len(token) > 8:
-                        return (
-                            "Bearer " + token[:4] + "*" * (len(token) - 8) + token[-4:]
-                        )
+                        mask = "*" * min(len(token) - 8, _MAX_MASK_LENGTH)
+                        return f"Bearer {token[:4]}{mask}{token[-4:]}"
                     return "Bearer ****"
                 return "****"
-            if k in ("cookie", "set-cookie", "x-api-key"):
+            if k in _REDACTED_HEADERS:
                 return "****"
         except Exception as e:
             logger.debug(f"Error redacting header: {e}")
         return value
 
+    def _format_headers(self, headers: Mapping[str, str]) -> str:
+        lines = []
+        for key, value in headers.items():
+            if key.lower() in _REDACTED_HEADERS:
+                value = self._redact_header(key, value)
+            lines.append(f"{key}: {value}")
+        return "\n".join(lines)
+
     def _setup_ui(self):
         logger.debug("Setting up RequestDetailsWidget UI")
         layout = QVBoxLayout(self)
@@ -86,7 +215,10 @@ class RequestDetailsWidget(QWidget):
 
         body_label = QLabel("Body:")
         request_layout.addWidget(body_label)
-        self.request_body = QTextEdit()
+        # Prompts carry the whole conversation, so use the linear-layout editor
+        self.request_body = QPlainTextEdit()
+        self.request_body.setReadOnly(True)
+        self.request_body.setUndoRedoEnabled(False)
         request_layout.addWidget(self.request_body)
 
         splitter.addWidget(request_widget)
@@ -117,17 +249,19 @@ class RequestDetailsWidget(QWidget):
 
         self.response_body_tabs = QTabWidget()
 
-        self.response_body_parsed = QTextEdit()
+        # Plain-text editors lay out large bodies in linear time, unlike QTextEdit
+        self.response_body_parsed = QPlainTextEdit()
         self.response_body_parsed.setReadOnly(True)
         with contextlib.suppress(Exception):
             self.response_body_parsed.setUndoRedoEnabled(False)
         self.response_body_tabs.addTab(self.response_body_parsed, "Parsed")
 
-        self.response_body_raw = QTextEdit()
+        self.response_body_raw = QPlainTextEdit()
         self.response_body_raw.setReadOnly(True)
         with contextlib.suppress(Exception):
             self.response_body_raw.setUndoRedoEnabled(False)
         self.response_body_tabs.addTab(self.response_body_raw, "Raw")
+        self.response_body_tabs.currentChanged.connect(self._on_body_tab_changed)
 
         response_layout.addWidget(self.response_body_tabs)
 
@@ -138,6 +272,12 @@ class RequestDetailsWidget(QWidget):
         splitter.setStretchFactor(0, 1)
         splitter.setStretchFactor(1, 1)
 
+        # Read-only viewers: no undo stack copying each body, no HTML parsing
+        for editor in (self.request_headers, self.response_headers):
+            editor.setReadOnly(True)
+            editor.setAcceptRichText(False)
+            editor.setUndoRedoEnabled(False)
+
         layout.addWidget(splitter)
         logger.debug("RequestDetailsWidget UI setup complete")
 
@@ -145,65 +285,112 @@ class RequestDetailsWidget(QWidget):
         try:
             if self._stream_buffer is None:
                 return
+            started = time.perf_counter()
             # During streaming, avoid heavy formatting; assume server already extracted readable text
             content = self._stream_buffer
-            self.response_body_parsed.setPlainText(content)
-            # Move cursor to end without ensureCursorVisible (costly); rely on QTextEdit behavior
-            cursor = self.response_body_parsed.textCursor()
-            cursor.movePosition(cursor.MoveOperation.End)
-            self.response_body_parsed.setTextCursor(cursor)
+            shown = self._flushed_content
+            editor = self.response_body_parsed
+            if (
+                shown
+                and len(content) <= MAX_DISPLAY_CHARS
+                and content.startswith(shown)
+            ):
+                # Streamed text only grows: insert the new tail at the end
+                self._awaiting_format.pop(editor, None)
+                cursor = editor.textCursor()
+                cursor.movePosition(cursor.MoveOperation.End)
+                cursor.insertText(content[len(shown) :])
+            else:
+                self._set_body_text(editor, _cap_for_display(content))
+                cursor = editor.textCursor()
+                cursor.movePosition(cursor.MoveOperation.End)
+            # Move cursor to end without ensureCursorVisible (costly); rely on editor behavior
+            editor.setTextCursor(cursor)
+            self._flushed_content = content
+            self._adapt_flush_interval((time.perf_counter() - started) * 1000.0)
             logger.debug(
                 f"[Streaming Flush] Updated parsed body with {len(content)} chars"
             )
         except Exception:
             logger.exception("Failed flushing streaming buffer to UI")
 
-    def _format_body_content(self, body: str, headers: dict) -> str:
-        if not body or not body.strip():
-            return body
-
-        content_type = ""
-        for key, value in headers.items():
-            if key.lower() == "content-type":
-                content_type = value.lower()
-                break
-
-        try:
-            if "application/json" in content_type or "text/json" in content_type:
-                parsed = json.loads(body)
-                return json.dumps(parsed, indent=2, ensure_ascii=False)
-
-            elif "application/xml" in content_type or "text/xml" in content_type:
-                dom = defusedxml.minidom.parseString(body)
-                return dom.toprettyxml(indent="  ")
-
-            elif "text/html" in content_type:
-                return self._format_html(body)
-
-            else:
-                return body
-
-        except Exception as e:
-            logger.debug(f"Failed to format body content: {e}")
-            return body
-
-    def _format_html(self, html: str) -> str:
-        try:
-            import re
+    def _adapt_flush_interval(self, flush_ms: float):
+        """Flush less often while flushes are slow, and more often when cheap."""
+        interval = self._flush_interval_ms
+        if flush_ms > SLOW_FLUSH_MS:
+            interval = min(interval * 2, MAX_FLUSH_INTERVAL_MS)
+        elif flush_ms < FAST_FLUSH_MS:
+            interval = max(interval // 2, MIN_FLUSH_INTERVAL_MS)
+        if interval != self._flush_interval_ms:
+            self._flush_interval_ms = interval
+            self._flush_timer.setInterval(interval)
+
+    def _cached_format(self, body: str, content_type: str) -> str | None:
+        """Return the formatted body from an earlier selection, if kept."""
+        key = (body, content_type)
+        # str caches its hash, so repeat lookups of a body do not rehash it
+        formatted = self._format_cache.get(key)
+        if formatted is not None:
+            self._format_cache.move_to_end(key)
+        return formatted
+
+    def _store_format(self, body: str, content_type: str, formatted: str):
+        self._format_cache[(body, content_type)] = formatted
+        if len(self._format_cache) > FORMAT_CACHE_SIZE:
+            self._format_cache.popitem(last=False)
+
+    def _set_body_text(self, editor: QPlainTextEdit, text: str):
+        self._awaiting_format.pop(editor, None)
+        editor.setPlainText(text)
+
+    def _show_formatted(
+        self, editor: QPlainTextEdit, body: str, content_type: str
+    ) -> str | None:
+        """Show a formatted body, formatting large new ones on the thread pool.
+
+        Returns the displayed text, or None while formatting is in progress.
+        """
+        formatted = self._cached_format(body, content_type)
+        if formatted is None and len(body) < ASYNC_FORMAT_CHARS:
+            formatted = _format_body(body, content_type)
+            self._store_format(body, content_type, formatted)
+        if formatted is not None:
+            displayed = _cap_for_display(formatted)
+            self._set_body_text(editor, displayed)
+            return displayed
+
+        key = (body, content_type)
+        self._set_body_text(editor, f"[Formatting {len(body)} characters...]")
+        self._awaiting_format[editor] = key
+        if key not in self._format_jobs:
+            self._format_jobs.add(key)
+            QThreadPool.globalInstance().start(
+                _FormatJob(body, content_type, self._format_signals)
+            )
+        return None
 
-            formatted = re.sub(r"(</[^>]+>)", r"\1\n", html)
-            formatted = re.sub(r"(<[^/>]+[^/]>)", r"\1\n", formatted)
-            formatted = re.sub(r"\n\s*\n", "\n", formatted)
-            return formatted.strip()
-        except Exception:
-            return html
+    def _on_body_formatted(self, body: str, content_type: str, formatted: str):
+        key = (body, content_type)
+        if key not in self._format_jobs:
+            # The view was cleared while this body was being formatted
+            return
+        self._format_jobs.discard(key)
+        self._store_format(body, content_type, formatted)
+        displayed = _cap_for_display(formatted)
+        for editor, awaited in list(self._awaiting_format.items()):
+            if awaited == key:
+                self._set_body_text(editor, displayed)
 
     def set_request(self, request: InterceptedRequest | None):
         self.current_request = request
         self._stream_buffer = ""
-        self._last_meta_text = ""
+        self._flushed_content = ""
+        self._last_title_key = None
         if self._flush_timer.isActive():
             self._flush_timer.stop()
+        # A debounced update still due belongs to the previous selection
+        self._update_timer.stop()
+        self._pending_update = None
 
         if request is None:
             logger.debug("Clearing request details (None request)")
@@ -213,22 +400,33 @@ class RequestDetailsWidget(QWidget):
             self.response_headers.clear()
             self.response_body_parsed.clear()
             self.response_body_raw.clear()
+            self._pending_raw = None
+            self._awaiting_format.clear()
             return
 
         logger.info(
             f"Setting request details for: {request.request.method} {request.request.url}"
         )
 
-        headers_text = "\n".join(
-            f"{k}: {self._redact_header(k, v)}"
-            for k, v in request.request.headers.items()
-        )
-        self.request_headers.setPlainText(headers_text)
+        # Repaint once after every pane is filled rather than once per pane
+        self.setUpdatesEnabled(False)
+        try:
+            self._populate(request)
+        finally:
+            self.setUpdatesEnabled(True)
 
-        formatted_request_body = self._format_body_content(
-            request.request.body, request.request.headers
+        logger.debug("Request details updated successfully")
+
+    def _populate(self, request: InterceptedRequest):
+        if request.request_headers_text is None:
+            request.request_headers_text = self._format_headers(request.request.headers)
+        self.request_headers.setPlainText(request.request_headers_text)
+
+        self._show_formatted(
+            self.request_body,
+            request.request.body,
+            _content_type_of(request.request.headers),
         )
-        self.request_body.setPlainText(formatted_request_body)
 
         meta = []
         try:
@@ -243,28 +441,25 @@ class RequestDetailsWidget(QWidget):
             f"RESPONSE: ({request.response.status_code} {request.response.status_text}){meta_suffix}"
         )
 
-        headers_text = "\n".join(
-            f"{k}: {self._redact_header(k, v)}"
-            for k, v in request.response.headers.items()
-        )
-        self.response_headers.setPlainText(headers_text)
+        if request.response_headers_text is None:
+            request.response_headers_text = self._format_headers(
+                request.response.headers
+            )
+        self.response_headers.setPlainText(request.response_headers_text)
 
-        formatted_response_body = self._format_body_content(
-            request.response.body, request.response.headers
+        response_content_type = _content_type_of(request.response.headers)
+        displayed_response_body = self._show_formatted(
+            self.response_body_parsed, request.response.body, response_content_type
         )
-        self.response_body_parsed.setPlainText(formatted_response_body)
 
-        raw_response_body = (
-            request.response.raw_body
-            if hasattr(request.response, "raw_body") and request.response.raw_body
-            else request.response.body
-        )
-        formatted_raw_body = self._format_body_content(
-            raw_response_body, request.response.headers
+        raw_response_body = request.response.raw_body or request.response.body
+        displayed_raw_body = None
+        if raw_response_body == request.response.body:
+            # Non-streaming responses usually carry the same text in both
+            displayed_raw_body = displayed_response_body
+        self._show_raw_body(
+            raw_response_body, response_content_type, displayed_raw_body
         )
-        self.response_body_raw.setPlainText(formatted_raw_body)
-
-        logger.debug("Request details updated successfully")
 
     def _build_response_title(self, r: InterceptedRequest) -> str:
         meta: list[str] = []
@@ -283,7 +478,8 @@ class RequestDetailsWidget(QWidget):
         return f"RESPONSE: ({r.response.status_code} {r.response.status_text}){meta_suffix}"
 
     def _schedule_stream_flush(self, content: str):
-        if not content:
+        # Updates that carry no new text (e.g. keepalives) need no repaint
+        if not content or content == self._stream_buffer:
             return
         self._stream_buffer = content
         if not self._flush_timer.isActive():
@@ -295,11 +491,14 @@ class RequestDetailsWidget(QWidget):
 
         logger.debug("Scheduling debounced streaming content update")
         self._pending_update = updated_request
-        self._update_timer.start(self._debounce_interval)
+        # Restarting a running timer would hold every update back until the
+        # stream pauses, since updates arrive faster than the interval
+        if not self._update_timer.isActive():
+            self._update_timer.start(self._debounce_interval)
 
     def _debounced_update_streaming(self):
         """Debounced method that processes the actual streaming update."""
-        if hasattr(self, "_pending_update") and self._pending_update:
+        if self._pending_update:
             self._perform_actual_update(self._pending_update)
             self._pending_update = None
 
@@ -308,24 +507,51 @@ class RequestDetailsWidget(QWidget):
         logger.debug("Performing actual streaming content update (debounced)")
         self.current_request = updated_request
 
-        new_title = self._build_response_title(updated_request)
-        if new_title != self._last_meta_text:
-            self._last_meta_text = new_title
-            self.response_title.setText(new_title)
+        response = updated_request.response
+        title_key = (
+            response.status_code,
+            response.is_streaming,
+            response.streaming_complete,
+            len(response.streaming_content or ""),
+            response.latency_ms,
+            response.total_tokens,
+        )
+        if title_key != self._last_title_key:
+            self._last_title_key = title_key
+            self.response_title.setText(self._build_response_title(updated_request))
 
         self._schedule_stream_flush(updated_request.response.streaming_content or "")
 
         if updated_request.response.streaming_complete:
             raw_content = (
-                updated_request.response.raw_body
-                if hasattr(updated_request.response, "raw_body")
-                and updated_request.response.raw_body
-                else updated_request.response.body
+                updated_request.response.raw_body or updated_request.response.body
             )
-            formatted_raw = self._format_body_content(
-                raw_content, updated_request.response.headers
+            self._show_raw_body(
+                raw_content, _content_type_of(updated_request.response.headers)
             )
-            self.response_body_raw.setPlainText(formatted_raw)
+
+    def _show_raw_body(
+        self, raw_body: str, content_type: str, displayed: str | None = None
+    ):
+        """Fill the Raw tab now if it is visible, otherwise once it is opened."""
+        if self.response_body_tabs.currentWidget() is not self.response_body_raw:
+            self._pending_raw = (raw_body, content_type, displayed)
+            self._set_body_text(self.response_body_raw, "")
+            return
+        self._pending_raw = None
+        if displayed is None:
+            self._show_formatted(self.response_body_raw, raw_body, content_type)
+        else:
+            self._set_body_text(self.response_body_raw, displayed)
+
+    def _on_body_tab_changed(self, index: int):
+        if (
+            self._pending_raw is not None
+            and self.response_body_tabs.widget(index) is self.response_body_raw
+        ):
+            self._show_raw_body(*self._pending_raw)
 
     def clear(self):
+        self._format_cache.clear()
+        self._format_jobs.clear()
         self.set_request(None)
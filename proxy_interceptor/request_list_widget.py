@@ -1,15 +1,135 @@
-import json
 import logging
+import time
+from datetime import datetime
 from urllib.parse import urlparse
 
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtWidgets import QLabel, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+import orjson
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    Qt,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt6.QtWidgets import QLabel, QListView, QVBoxLayout, QWidget
 
 from proxy_interceptor.models import InterceptedRequest
 
 logger = logging.getLogger(__name__)
 
 
+def _model_name(request: InterceptedRequest) -> str:
+    try:
+        if request.request.body:
+            body_data = orjson.loads(request.request.body)
+            return body_data.get("model", "unknown")
+    except (orjson.JSONDecodeError, AttributeError):
+        pass
+    return "unknown"
+
+
+def _request_label(request: InterceptedRequest, model_name: str) -> str:
+    parsed_url = urlparse(request.request.url)
+    path = parsed_url.path if parsed_url.path else "/"
+
+    suffix = ""
+    try:
+        response = request.response
+        parts = []
+        if response.is_streaming and not response.streaming_complete:
+            parts.append(f"streaming: {len(response.streaming_content)} chars")
+        else:
+            if response.latency_ms is not None:
+                parts.append(f"{response.latency_ms:.0f}ms")
+            if response.total_tokens is not None:
+                parts.append(f"tok:{response.total_tokens}")
+        if parts:
+            suffix = "  (" + ", ".join(parts) + ")"
+    except Exception as e:
+        logger.debug(f"Error creating suffix: {e}")
+
+    return (
+        f"[{request.request.timestamp.strftime('%H:%M:%S')}] "
+        f"{request.request.method} {path} - {model_name}{suffix}"
+    )
+
+
+class RequestListModel(QAbstractListModel):
+    """List model over the intercepted requests, oldest first."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[InterceptedRequest] = []
+        # Labels are built on first paint and dropped when a row changes;
+        # model names are parsed from the request body once per row
+        self._labels: list[str | None] = []
+        self._model_names: list[str | None] = []
+        self._row_by_timestamp: dict[datetime, int] = {}
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            label = self._labels[row]
+            if label is None:
+                label = _request_label(self._rows[row], self.model_name(row))
+                self._labels[row] = label
+            return label
+        if role == Qt.ItemDataRole.UserRole:
+            return self._rows[row]
+        return None
+
+    def model_name(self, row: int) -> str:
+        name = self._model_names[row]
+        if name is None:
+            name = _model_name(self._rows[row])
+            self._model_names[row] = name
+        return name
+
+    def request_at(self, row: int) -> InterceptedRequest:
+        return self._rows[row]
+
+    def append_requests(self, requests: list[InterceptedRequest]):
+        """Append a batch of requests with a single row insertion."""
+        if not requests:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(requests) - 1)
+        for row, request in enumerate(requests, start=first):
+            self._rows.append(request)
+            self._labels.append(None)
+            self._model_names.append(None)
+            self._row_by_timestamp.setdefault(request.request.timestamp, row)
+        self.endInsertRows()
+
+    def set_requests(self, requests: list[InterceptedRequest]):
+        self.beginResetModel()
+        self._rows = list(requests)
+        self._labels = [None] * len(self._rows)
+        self._model_names = [None] * len(self._rows)
+        self._row_by_timestamp = {}
+        for row, request in enumerate(self._rows):
+            self._row_by_timestamp.setdefault(request.request.timestamp, row)
+        self.endResetModel()
+
+    def update_request(self, request: InterceptedRequest) -> bool:
+        """Replace the row logged at the same time; False if it is not shown."""
+        row = self._row_by_timestamp.get(request.request.timestamp)
+        if row is None:
+            return False
+        self._rows[row] = request
+        self._labels[row] = None
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+        return True
+
+
 class RequestListWidget(QWidget):
     request_selected = pyqtSignal(InterceptedRequest)
     auto_follow_changed = pyqtSignal(bool)
@@ -38,17 +158,25 @@ class RequestListWidget(QWidget):
         header.setObjectName("header")
         layout.addWidget(header)
 
-        self.request_list = QListWidget()
+        self.model = RequestListModel(self)
+        self.request_list = QListView()
+        self.request_list.setModel(self.model)
+        # Every row is one line of text, so the view need not measure each one
+        self.request_list.setUniformItemSizes(True)
         self.request_list.setAlternatingRowColors(True)
-        self.request_list.itemClicked.connect(self._on_request_clicked)
-        self.request_list.currentItemChanged.connect(self._on_current_item_changed)
+        self.request_list.clicked.connect(self._on_request_clicked)
+        self.request_list.selectionModel().currentChanged.connect(
+            self._on_current_index_changed
+        )
         layout.addWidget(self.request_list)
         logger.debug("RequestListWidget UI setup complete")
 
     def set_requests(self, requests: list[InterceptedRequest]):
         logger.info(f"Setting {len(requests)} requests in list widget")
         self.requests = requests
-        self._update_list()
+        self._pending = []
+        self._flush_timer.stop()
+        self.model.set_requests(requests)
 
     def add_request(self, request: InterceptedRequest):
         self.requests.append(request)
@@ -60,148 +188,21 @@ class RequestListWidget(QWidget):
         except Exception:
             self._flush_pending()
 
-        # Auto-select the new request if auto-follow is enabled
-        if self._auto_follow_enabled:
-            self._auto_select_latest_request()
-
-    def _update_list(self):
-        logger.debug(f"Updating list widget with {len(self.requests)} requests")
-        self.request_list.clear()
-
-        for i, request in enumerate(self.requests):
-            item = QListWidgetItem()
-            parsed_url = urlparse(request.request.url)
-            path = parsed_url.path if parsed_url.path else "/"
-
-            model_name = "unknown"
-            try:
-                if request.request.body:
-                    body_data = json.loads(request.request.body)
-                    model_name = body_data.get("model", "unknown")
-            except (json.JSONDecodeError, AttributeError):
-                pass
-
-            suffix = ""
-            try:
-                lat = request.response.latency_ms
-                tok = request.response.total_tokens
-                parts = []
-                if lat is not None:
-                    parts.append(f"{lat:.0f}ms")
-                if tok is not None:
-                    parts.append(f"tok:{tok}")
-                if parts:
-                    suffix = "  (" + ", ".join(parts) + ")"
-            except Exception as e:
-                logger.debug(f"Error creating suffix: {e}")
-
-            item.setText(
-                f"[{request.request.timestamp.strftime('%H:%M:%S')}] "
-                f"{request.request.method} {path} - {model_name}{suffix}"
-            )
-            item.setData(Qt.ItemDataRole.UserRole, request)
-            self.request_list.addItem(item)
-            logger.debug(
-                f"Added request {i + 1} to list: {request.request.method} {path} - {model_name}{suffix}"
-            )
-
-    def _create_list_item(self, request: InterceptedRequest) -> QListWidgetItem:
-        item = QListWidgetItem()
-        parsed_url = urlparse(request.request.url)
-        path = parsed_url.path if parsed_url.path else "/"
-
-        model_name = "unknown"
-        try:
-            if request.request.body:
-                body_data = json.loads(request.request.body)
-                model_name = body_data.get("model", "unknown")
-        except (json.JSONDecodeError, AttributeError):
-            pass
-
-        suffix = ""
-        try:
-            lat = request.response.latency_ms
-            tok = request.response.total_tokens
-            parts = []
-            if lat is not None:
-                parts.append(f"{lat:.0f}ms")
-            if tok is not None:
-                parts.append(f"tok:{tok}")
-            if parts:
-                suffix = "  (" + ", ".join(parts) + ")"
-        except Exception as e:
-            logger.debug(f"Error creating suffix: {e}")
-
-        item.setText(
-            f"[{request.request.timestamp.strftime('%H:%M:%S')}] "
-            f"{request.request.method} {path} - {model_name}{suffix}"
-        )
-        item.setData(Qt.ItemDataRole.UserRole, request)
-        return item
-
-    # ruff: noqa: C901
     def update_streaming_request(self, updated_request: InterceptedRequest):
-        for i, existing_request in enumerate(self.requests):
-            if existing_request.request.timestamp == updated_request.request.timestamp:
-                self.requests[i] = updated_request
-
-                item = self.request_list.item(i)
-                if item:
-                    parsed_url = urlparse(updated_request.request.url)
-                    path = parsed_url.path if parsed_url.path else "/"
-
-                    model_name = "unknown"
-                    try:
-                        if updated_request.request.body:
-                            body_data = json.loads(updated_request.request.body)
-                            model_name = body_data.get("model", "unknown")
-                    except (json.JSONDecodeError, AttributeError):
-                        pass
-
-                    suffix = ""
-                    try:
-                        parts = []
-                        if (
-                            updated_request.response.is_streaming
-                            and not updated_request.response.streaming_complete
-                        ):
-                            content_len = len(
-                                updated_request.response.streaming_content
-                            )
-                            parts.append(f"streaming: {content_len} chars")
-                        elif updated_request.response.streaming_complete:
-                            lat = updated_request.response.latency_ms
-                            tok = updated_request.response.total_tokens
-                            if lat is not None:
-                                parts.append(f"{lat:.0f}ms")
-                            if tok is not None:
-                                parts.append(f"tok:{tok}")
-                        if parts:
-                            suffix = "  (" + ", ".join(parts) + ")"
-                    except Exception as e:
-                        logger.debug(f"Error creating streaming suffix: {e}")
-
-                    item.setText(
-                        f"[{updated_request.request.timestamp.strftime('%H:%M:%S')}] "
-                        f"{updated_request.request.method} {path} - {model_name}{suffix}"
-                    )
-                    item.setData(Qt.ItemDataRole.UserRole, updated_request)
-                break
+        # Rows still waiting for the batched append are labelled when added
+        self.model.update_request(updated_request)
 
     def _flush_pending(self):
         if not self._pending:
             return
-        import time
 
         start = time.perf_counter()
         pending = self._pending
         self._pending = []
-        for request in pending:
-            try:
-                item = self._create_list_item(request)
-                self.request_list.addItem(item)
-            except Exception:
-                logger.exception("Failed to append pending request to list")
+        try:
+            self.model.append_requests(pending)
+        except Exception:
+            logger.exception("Failed to append pending requests to list")
         elapsed_ms = (time.perf_counter() - start) * 1000.0
         if elapsed_ms > 50:
             logger.info(
@@ -209,39 +210,27 @@ class RequestListWidget(QWidget):
             )
 
         # Auto-select the latest request if auto-follow is enabled
-        if self._auto_follow_enabled and pending:
+        if self._auto_follow_enabled:
             self._auto_select_latest_request()
 
-    def _on_request_clicked(self, item: QListWidgetItem):
+    def _on_request_clicked(self, index: QModelIndex):
         """Handle manual clicks on request items."""
-        if item and self._auto_follow_enabled:
+        if index.isValid() and self._auto_follow_enabled:
             # User manually clicked, disable auto-follow
             self._user_manually_selected = True
             self.set_auto_follow_enabled(False)
             logger.info("Auto-follow disabled due to manual click")
 
-    def _on_current_item_changed(
-        self, current: QListWidgetItem, previous: QListWidgetItem
-    ):
+    def _on_current_index_changed(self, current: QModelIndex, previous: QModelIndex):
         """Handle when the current item changes (both manual and automatic)."""
-        if current:
-            request = current.data(Qt.ItemDataRole.UserRole)
-            if request:
-                parsed_url = urlparse(request.request.url)
-                path = parsed_url.path if parsed_url.path else "/"
-
-                model_name = "unknown"
-                try:
-                    if request.request.body:
-                        body_data = json.loads(request.request.body)
-                        model_name = body_data.get("model", "unknown")
-                except (json.JSONDecodeError, AttributeError):
-                    pass
-
-                logger.info(
-                    f"Request selected from list: {request.request.method} {path} - {model_name}"
-                )
-                self.request_selected.emit(request)
+        if current.isValid():
+            request = self.model.request_at(current.row())
+            parsed_url = urlparse(request.request.url)
+            path = parsed_url.path if parsed_url.path else "/"
+            logger.info(
+                f"Request selected from list: {request.request.method} {path} - {self.model.model_name(current.row())}"
+            )
+            self.request_selected.emit(request)
 
     def set_auto_follow_enabled(self, enabled: bool):
         """Enable or disable auto-follow for new requests."""
@@ -264,20 +253,18 @@ class RequestListWidget(QWidget):
 
     def _auto_select_latest_request(self):
         """Automatically select the latest request in the list."""
-        if self.request_list.count() > 0:
-            # Get the last item (most recent request)
-            last_item = self.request_list.item(self.request_list.count() - 1)
-            if last_item:
-                # Mark this as an automatic selection to avoid disabling auto-follow
-                self._user_manually_selected = False
-
-                # Select the item in the list
-                self.request_list.setCurrentItem(last_item)
-
-                # Directly emit the selection signal and update details
-                request = last_item.data(Qt.ItemDataRole.UserRole)
-                if request:
-                    logger.debug(
-                        f"Auto-selected latest request: {request.request.method} {request.request.url}"
-                    )
-                    self.request_selected.emit(request)
+        row_count = self.model.rowCount()
+        if row_count == 0:
+            return
+        # Mark this as an automatic selection to avoid disabling auto-follow
+        self._user_manually_selected = False
+
+        # Making the last row current emits request_selected through
+        # _on_current_index_changed
+        last_index = self.model.index(row_count - 1)
+        if self.request_list.currentIndex() != last_index:
+            self.request_list.setCurrentIndex(last_index)
+            request = self.model.request_at(row_count - 1)
+            logger.debug(
+                f"Auto-selected latest request: {request.request.method} {request.request.url}"
+            )
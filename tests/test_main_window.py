@@ -77,35 +77,43 @@ class TestMainWindow:
         finally:
             loop.close()
 
+    def _find_request_rows(self, window, text):
+        """Find the list rows whose label contains the given text."""
+        model = window.request_list_widget.request_list.model()
+        if model.rowCount() == 0:
+            return []
+        return model.match(
+            model.index(0, 0),
+            Qt.ItemDataRole.DisplayRole,
+            text,
+            -1,
+            Qt.MatchFlag.MatchContains,
+        )
+
     def _verify_request_in_list(self, window, qtbot):
         """Wait for and verify that the request appears in the list."""
         # Wait for the request to appear in the requests list
         qtbot.waitUntil(
-            lambda: len(
-                window.request_list_widget.request_list.findItems(
-                    "POST /v1/chat/completions", Qt.MatchFlag.MatchContains
-                )
-            )
-            > 0,
+            lambda: (
+                len(self._find_request_rows(window, "POST /v1/chat/completions")) > 0
+            ),
             timeout=5000,
         )
 
         # Verify the request is in the list
-        items = window.request_list_widget.request_list.findItems(
-            "POST /v1/chat/completions", Qt.MatchFlag.MatchContains
-        )
-        assert len(items) == 1
-        request_item = items[0]
-        assert "POST /v1/chat/completions" in request_item.text()
+        rows = self._find_request_rows(window, "POST /v1/chat/completions")
+        assert len(rows) == 1
+        request_index = rows[0]
+        assert "POST /v1/chat/completions" in request_index.data()
 
-        return request_item
+        return request_index
 
-    def _select_request_and_verify_details(self, window, qtbot, request_item):
-        """Select a request item and verify its details are populated."""
-        list_widget = window.request_list_widget.request_list
-        rect = list_widget.visualItemRect(request_item)
+    def _select_request_and_verify_details(self, window, qtbot, request_index):
+        """Select a request row and verify its details are populated."""
+        list_view = window.request_list_widget.request_list
+        rect = list_view.visualRect(request_index)
         qtbot.mouseClick(
-            list_widget.viewport(), Qt.MouseButton.LeftButton, pos=rect.center()
+            list_view.viewport(), Qt.MouseButton.LeftButton, pos=rect.center()
         )
 
         # Wait until details are populated
@@ -184,10 +192,10 @@ class TestMainWindow:
         clear_btn = self._find_clear_button(window)
         qtbot.mouseClick(clear_btn, Qt.MouseButton.LeftButton)
 
-        # Wait and check that there are no requests in list_widget
-        list_widget = window.request_list_widget.request_list
-        qtbot.waitUntil(lambda: list_widget.count() == 0, timeout=3000)
-        assert list_widget.count() == 0
+        # Wait and check that there are no requests in the list
+        list_model = window.request_list_widget.request_list.model()
+        qtbot.waitUntil(lambda: list_model.rowCount() == 0, timeout=3000)
+        assert list_model.rowCount() == 0
 
     def _find_configuration_tab(self, window):
         """Find and switch to the Configuration tab."""
@@ -299,8 +307,8 @@ class TestMainWindow:
         self._execute_async_request(async_request)
 
         # 3. Verify request appears in list and select it
-        request_item = self._verify_request_in_list(window, qtbot)
-        self._select_request_and_verify_details(window, qtbot, request_item)
+        request_index = self._verify_request_in_list(window, qtbot)
+        self._select_request_and_verify_details(window, qtbot, request_index)
 
         # 4. Test response tabs functionality
         self._verify_response_tabs(window)
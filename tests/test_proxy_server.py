@@ -0,0 +1,680 @@
+# tests/test_proxy_server.py
+import asyncio
+import gzip
+import json
+import socket
+import subprocess
+import sys
+
+import httpx
+
+from proxy_interceptor.proxy_server import ProxyConfig, ProxyServer
+
+COMPLETION = {
+    "choices": [{"message": {"content": "hi there"}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+}
+
+
+def _make_server(upstream, **config_overrides) -> tuple[ProxyServer, list, list]:
+    """Create a ProxyServer whose upstream client is served by `upstream`."""
+    intercepts, updates = [], []
+    config_overrides.setdefault("openrouter_api_keys", ["sk-or-test"])
+    config_overrides.setdefault("openrouter_api_models", ["test/model"])
+    config = ProxyConfig(**config_overrides)
+    server = ProxyServer(
+        config, on_intercept=intercepts.append, on_streaming_update=updates.append
+    )
+    server._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    return server, intercepts, updates
+
+
+async def _post(server: ProxyServer, payload: dict) -> httpx.Response:
+    """Send a chat completion request through the proxy app."""
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        return await c.post("/v1/chat/completions", json=payload)
+
+
+class TestCapturedBodyLimit:
+    """Test cases for bounding the captured upstream body."""
+
+    def _non_streaming(self, body: bytes, **config_overrides):
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=body)
+
+        server, _, _ = _make_server(upstream, **config_overrides)
+        response = asyncio.run(_post(server, {"model": "x", "messages": []}))
+        assert response.status_code == 200
+        return server.get_requests()[0].response
+
+    def test_small_body_is_kept_whole(self):
+        """Bodies under the limit are stored without a marker."""
+        body = json.dumps(COMPLETION).encode()
+        captured = self._non_streaming(body, max_captured_body_bytes=1024)
+        assert captured.raw_body == body.decode()
+        assert captured.raw_body_size == len(body)
+        assert captured.body == "hi there"
+        assert captured.total_tokens == 3
+
+    def test_large_body_is_truncated_with_marker(self):
+        """Bodies over the limit keep the prefix and record the dropped size."""
+        body = json.dumps({"data": "x" * 10_000}).encode()
+        captured = self._non_streaming(body, max_captured_body_bytes=100)
+        assert captured.raw_body_size == len(body)
+        assert captured.raw_body.startswith(body[:100].decode())
+        assert captured.raw_body.endswith(f"...[truncated {len(body) - 100} bytes]")
+        # The pretty-printed fallback body is bounded as well
+        assert captured.body.endswith("chars]")
+        assert len(captured.body) < 200
+
+    def test_zero_limit_keeps_everything(self):
+        """A limit of 0 disables truncation instead of dropping the body."""
+        body = json.dumps({"data": "x" * 10_000}).encode()
+        captured = self._non_streaming(body, max_captured_body_bytes=0)
+        assert captured.raw_body == body.decode()
+        assert "truncated" not in captured.body
+
+    def test_captured_memory_is_bounded(self):
+        """Retained strings stay near the limit for multi-megabyte bodies."""
+        body = json.dumps({"data": "x" * 4_000_000}).encode()
+        captured = self._non_streaming(body, max_captured_body_bytes=64 * 1024)
+        assert sys.getsizeof(captured.raw_body) < 80 * 1024
+        assert sys.getsizeof(captured.body) < 80 * 1024
+
+    def test_streaming_fallback_body_is_not_empty(self):
+        """Streams without delta content fall back to the bounded raw text."""
+        stream = b"data: " + json.dumps({"data": "y" * 500}).encode() + b"\n\n"
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=stream
+            )
+
+        for limit, expected in ((0, stream.decode()), (64, None)):
+            server, _, _ = _make_server(upstream, max_captured_body_bytes=limit)
+            payload = {"model": "x", "messages": [], "stream": True}
+            response = asyncio.run(_post(server, payload))
+            assert response.content == stream
+            captured = server.get_requests()[0].response
+            assert captured.raw_body_size == len(stream)
+            assert captured.streaming_complete
+            if expected is not None:
+                assert captured.body == expected
+            else:
+                assert captured.body.startswith(stream[:64].decode())
+                assert captured.body.endswith("bytes]")
+
+
+class TestUiCallbackQueue:
+    """Test cases for the queued delivery of UI callbacks."""
+
+    def _server(self) -> ProxyServer:
+        return ProxyServer(ProxyConfig(openrouter_api_keys=["sk-or-test"]))
+
+    def test_worker_delivers_in_order(self):
+        """Callbacks reach the UI in the order they were queued."""
+        server = self._server()
+        delivered = []
+
+        async def run():
+            server._start_ui_worker()
+            for i in range(5):
+                server._notify_ui(delivered.append, i, must_deliver=i == 4)
+            await asyncio.sleep(0.01)
+            await server._stop_ui_worker()
+
+        asyncio.run(run())
+        assert delivered == [0, 1, 2, 3, 4]
+        assert server._ui_worker_task is None
+
+    def test_stop_delivers_pending_callbacks(self):
+        """Stopping the worker flushes callbacks that were still queued."""
+        server = self._server()
+        delivered = []
+
+        async def run():
+            server._start_ui_worker()
+            server._notify_ui(delivered.append, "final", must_deliver=True)
+            await server._stop_ui_worker()
+
+        asyncio.run(run())
+        assert delivered == ["final"]
+
+    def test_full_queue_keeps_every_must_deliver_entry(self):
+        """Only streaming updates are evicted once the queue is full."""
+        server = self._server()
+        server._ui_queue_limit = 8
+        delivered = []
+
+        for i in range(20):
+            server._notify_ui(delivered.append, ("update", i))
+            if i % 3 == 0:
+                server._notify_ui(delivered.append, ("final", i), must_deliver=True)
+
+        # More must-deliver entries than the bound: the queue grows past it
+        for i in range(20, 32):
+            server._notify_ui(delivered.append, ("final", i), must_deliver=True)
+        server._notify_ui(delivered.append, ("update", 99))
+
+        server._drain_ui_queue()
+        finals = [i for kind, i in delivered if kind == "final"]
+        assert finals == [*range(0, 20, 3), *range(20, 32)]
+        assert ("update", 99) not in delivered
+        updates = [i for kind, i in delivered if kind == "update"]
+        assert updates == sorted(updates)
+
+    def test_pending_streaming_updates_are_coalesced(self):
+        """A request with an update still queued is not queued again."""
+        server = self._server()
+        delivered = []
+        first, second = ["first"], ["second"]
+
+        for _ in range(5):
+            server._notify_ui(delivered.append, first)
+        server._notify_ui(delivered.append, second)
+        server._notify_ui(delivered.append, first, must_deliver=True)
+        server._drain_ui_queue()
+        assert delivered == [first, second, first]
+
+        # Once delivered, the next update for the request is queued again
+        server._notify_ui(delivered.append, first)
+        server._drain_ui_queue()
+        assert delivered == [first, second, first, first]
+
+
+class TestRequestHandling:
+    """Test cases for reading the incoming chat completion request."""
+
+    def test_invalid_json_is_rejected(self):
+        """A body that is not JSON gets a 400 without calling upstream."""
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            raise AssertionError("upstream must not be called")
+
+        server, _, _ = _make_server(upstream)
+
+        async def run():
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.post("/v1/chat/completions", content=b"{bad")
+
+        assert asyncio.run(run()).status_code == 400
+
+    def test_logged_body_carries_the_attempted_model(self):
+        """The logged request body names the model that answered."""
+        sent = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            sent.append(json.loads(request.content))
+            return httpx.Response(200, json=COMPLETION)
+
+        server, _, _ = _make_server(upstream)
+        asyncio.run(_post(server, {"model": "x", "messages": [], "n": 1}))
+
+        logged = json.loads(server.get_requests()[0].request.body)
+        assert logged == sent[0] == {"model": "test/model", "messages": [], "n": 1}
+
+    def test_unlogged_response_is_relayed_verbatim(self):
+        """With log_requests off the upstream bytes pass through unrecorded."""
+        body = b'{"choices": [], "id": "x"}'
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, headers={"content-type": "application/json"}, content=body
+            )
+
+        server, intercepts, _ = _make_server(upstream, log_requests=False)
+        response = asyncio.run(_post(server, {"model": "x", "messages": []}))
+        server._drain_ui_queue()
+
+        assert response.content == body
+        assert server.get_requests() == []
+        assert intercepts == []
+
+
+class TestModelsEndpoint:
+    """Test cases for the models list passthrough."""
+
+    async def _get_models(self, server: ProxyServer) -> httpx.Response:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await client.get("/v1/models")
+
+    def test_models_are_relayed_verbatim(self):
+        """The upstream models JSON reaches the client byte for byte."""
+        body = b'{"data": [{"id": "a/b", "pricing": {"prompt": "0"}}]}'
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            assert request.url.path.endswith("/models")
+            return httpx.Response(
+                200, headers={"content-type": "application/json"}, content=body
+            )
+
+        server, _, _ = _make_server(upstream)
+        response = asyncio.run(self._get_models(server))
+        assert response.status_code == 200
+        assert response.content == body
+        assert response.headers["content-type"] == "application/json"
+
+    def test_failed_key_falls_through_to_the_next(self):
+        """A rate-limited key does not fail the request while others remain."""
+        used_keys = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            used_keys.append(request.headers["authorization"])
+            if request.headers["authorization"] == "Bearer k1":
+                return httpx.Response(429, content=b"slow down")
+            return httpx.Response(200, json={"data": []})
+
+        server, _, _ = _make_server(upstream, openrouter_api_keys=["k1", "k2"])
+        response = asyncio.run(self._get_models(server))
+        assert response.status_code == 200
+        assert used_keys == ["Bearer k1", "Bearer k2"]
+
+    def test_slow_key_is_hedged(self):
+        """A slow first key is raced against the next one."""
+
+        async def upstream(request: httpx.Request) -> httpx.Response:
+            if request.headers["authorization"] == "Bearer k1":
+                await asyncio.sleep(5)
+            return httpx.Response(200, json={"key": request.headers["authorization"]})
+
+        server, _, _ = _make_server(upstream, openrouter_api_keys=["k1", "k2"])
+
+        async def run():
+            return await asyncio.wait_for(self._get_models(server), timeout=2)
+
+        assert asyncio.run(run()).json() == {"key": "Bearer k2"}
+
+    def test_all_keys_failing_reports_the_last_error(self):
+        """When every key fails the upstream status is passed on."""
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(401, content=b"bad key")
+
+        server, _, _ = _make_server(upstream, openrouter_api_keys=["k1", "k2"])
+        assert asyncio.run(self._get_models(server)).status_code == 401
+
+
+class TestKeyAndModelRotation:
+    """Test cases for API key rotation and model fallback."""
+
+    def test_invocation_timestamps_follow_attempts(self):
+        """Each model attempt is stamped when it started, not when received."""
+
+        async def upstream(request: httpx.Request) -> httpx.Response:
+            if json.loads(request.content)["model"] == "bad/model":
+                await asyncio.sleep(0.05)
+                return httpx.Response(429, content=b"rate limited")
+            return httpx.Response(200, json=COMPLETION)
+
+        server, _, _ = _make_server(
+            upstream, openrouter_api_models=["bad/model", "good/model"]
+        )
+        response = asyncio.run(_post(server, {"model": "x", "messages": []}))
+        assert response.status_code == 200
+
+        intercepted = server.get_requests()[0]
+        first, second = intercepted.model_invocations
+        assert intercepted.fallback_models_used == ["good/model"]
+        assert first.timestamp >= intercepted.request.timestamp
+        assert (second.timestamp - first.timestamp).total_seconds() >= 0.05
+
+    def test_keys_rotate_round_robin(self):
+        """Successive requests use the configured keys in turn."""
+        used_keys = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            used_keys.append(request.headers["authorization"])
+            return httpx.Response(200, json=COMPLETION)
+
+        server, _, _ = _make_server(
+            upstream, openrouter_api_keys=["sk-or-a", "sk-or-b", "sk-or-c"]
+        )
+
+        async def run():
+            for _ in range(4):
+                await _post(server, {"model": "x", "messages": []})
+
+        asyncio.run(run())
+        assert used_keys == [
+            "Bearer sk-or-a",
+            "Bearer sk-or-b",
+            "Bearer sk-or-c",
+            "Bearer sk-or-a",
+        ]
+
+
+def _delta(content: str) -> bytes:
+    return json.dumps({"choices": [{"delta": {"content": content}}]}).encode()
+
+
+class TestUpstreamErrors:
+    """Test cases for how upstream failures end a request."""
+
+    def _fail(self, status: int, stream: bool) -> tuple[httpx.Response, list]:
+        attempted = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            attempted.append(json.loads(request.content)["model"])
+            return httpx.Response(status, content=b"upstream says no")
+
+        server, _, _ = _make_server(upstream, openrouter_api_models=["a", "b", "c"])
+        payload = {"model": "x", "messages": [], "stream": stream}
+        return asyncio.run(_post(server, payload)), attempted
+
+    def test_key_errors_stop_the_model_fallback(self):
+        """Auth and credit failures are not retried on the other models."""
+        for status in (401, 402):
+            for stream in (True, False):
+                response, attempted = self._fail(status, stream)
+                assert response.status_code == status
+                assert attempted == ["a"]
+
+    def test_moderation_errors_try_the_next_model(self):
+        """A 403 from a moderated model falls back to the next model."""
+        attempted = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            model = json.loads(request.content)["model"]
+            attempted.append(model)
+            if model == "a":
+                return httpx.Response(403, content=b"input was flagged")
+            if json.loads(request.content)["stream"]:
+                return httpx.Response(
+                    200,
+                    headers={"content-type": "text/event-stream"},
+                    content=b"data: [DONE]\n\n",
+                )
+            return httpx.Response(200, json=COMPLETION)
+
+        for stream in (True, False):
+            attempted.clear()
+            server, _, _ = _make_server(upstream, openrouter_api_models=["a", "b"])
+            payload = {"model": "x", "messages": [], "stream": stream}
+            response = asyncio.run(_post(server, payload))
+            assert response.status_code == 200
+            assert attempted == ["a", "b"]
+
+    def test_model_errors_try_every_model(self):
+        """Other failures fall back through all models and keep their status."""
+        for stream in (True, False):
+            response, attempted = self._fail(502, stream)
+            assert response.status_code == 502
+            assert attempted == ["a", "b", "c"]
+
+    def test_error_bodies_are_read_bounded(self):
+        """A huge error page is quoted only up to a prefix in both modes."""
+        statuses = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses[-1], content=b"e" * 1_000_000)
+
+        for status in (429, 500):
+            statuses.append(status)
+            for stream in (True, False):
+                server, _, _ = _make_server(upstream)
+                payload = {"model": "x", "messages": [], "stream": stream}
+                response = asyncio.run(_post(server, payload))
+                assert response.status_code == status
+                assert len(response.json()["detail"]) < 4096
+
+
+class TestSseExtraction:
+    """Test cases for extracting delta content from SSE buffers."""
+
+    def _extract(self, data: bytes) -> tuple[list[str], bytearray]:
+        server = ProxyServer(ProxyConfig())
+        buffer, content = bytearray(data), []
+        server._extract_sse_content(buffer, content)
+        return content, buffer
+
+    def test_data_prefix_without_space(self):
+        """`data:` lines are parsed with or without the optional space."""
+        content, _ = self._extract(
+            b"data:" + _delta("a") + b"\n\ndata: " + _delta("b") + b"\n\n"
+        )
+        assert content == ["a", "b"]
+
+    def test_incomplete_final_line_stays_buffered(self):
+        """A final line without a newline is kept for the next chunk."""
+        tail = b"data: " + _delta("b")
+        content, buffer = self._extract(b"data: " + _delta("a") + b"\n" + tail)
+        assert content == ["a"]
+        assert bytes(buffer) == tail
+
+    def test_comments_and_done_are_skipped(self):
+        """Keep-alive comments, other fields and [DONE] yield no content."""
+        content, buffer = self._extract(
+            b": OPENROUTER PROCESSING\n\nevent: ping\n"
+            + b"data: "
+            + _delta("a")
+            + b"\r\n\r\ndata: [DONE]\n\n"
+        )
+        assert content == ["a"]
+        assert buffer == b""
+
+    def test_delta_content_edge_cases(self):
+        """Malformed or content-less payloads extract as empty strings."""
+        server = ProxyServer(ProxyConfig())
+        assert server._extract_delta_content(_delta("hi")) == "hi"
+        assert server._extract_delta_content(b"{not json") == ""
+        assert server._extract_delta_content(b'{"choices": []}') == ""
+        assert server._extract_delta_content(b'{"choices": [{"delta": {}}]}') == ""
+        assert server._extract_delta_content(b'{"usage": {"total_tokens": 1}}') == ""
+        assert server._extract_delta_content(b"[1, 2]") == ""
+        assert server._extract_delta_content(b'{"choices": [null]}') == ""
+        assert server._extract_delta_content(b'{"choices": [{"delta": "x"}]}') == ""
+        assert (
+            server._extract_delta_content(
+                b'{"choices": [{"delta": {"content": null}}]}'
+            )
+            == ""
+        )
+
+
+class TestStreamingCapture:
+    """Test cases for capturing streamed responses passed through the proxy."""
+
+    STREAM = (
+        b": OPENROUTER PROCESSING\n\n"
+        + b"data: "
+        + _delta("Hel")
+        + b"\r\n\r\n"
+        + b"data: "
+        + _delta("lo é")
+        + b"\n\n"
+        + b'data: {"choices": [{"delta": {}}], "usage": {"total_tokens": 5}}\n\n'
+        + b"data: [DONE]"
+    )
+
+    def _stream(
+        self, chunk_size: int, incremental: bool, stream: bytes = STREAM, **overrides
+    ):
+        async def chunks():
+            for i in range(0, len(stream), chunk_size):
+                yield stream[i : i + chunk_size]
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=chunks()
+            )
+
+        server, intercepts, updates = _make_server(upstream, **overrides)
+        if not incremental:
+            server.on_streaming_update = None
+        payload = {"model": "x", "messages": [], "stream": True}
+        response = asyncio.run(_post(server, payload))
+        server._drain_ui_queue()
+        return response, server.get_requests()[0].response, intercepts, updates
+
+    def test_content_is_extracted_in_both_modes(self):
+        """Split events, CRLF framing and [DONE] parse the same either way."""
+        # A chunk size of 1 splits every event and the two-byte "é" sequence
+        for chunk_size in (1, 7, len(self.STREAM)):
+            for incremental in (True, False):
+                response, captured, intercepts, updates = self._stream(
+                    chunk_size, incremental
+                )
+                assert response.content == self.STREAM
+                assert captured.body == "Hello é"
+                assert captured.streaming_content == "Hello é"
+                assert captured.streaming_complete
+                assert captured.raw_body == self.STREAM.decode()
+                assert captured.raw_body_size == len(self.STREAM)
+                assert len(intercepts) == 1
+                if incremental:
+                    # Incremental updates plus the final one
+                    assert len(updates) >= 2
+                    assert updates[-1].response.streaming_complete
+
+    def test_long_stream_is_extracted_past_the_capture_limit(self):
+        """Content beyond the capture limit is still extracted in full."""
+        stream = b"".join(b"data: " + _delta(f"{i} ") + b"\n\n" for i in range(500))
+        expected = "".join(f"{i} " for i in range(500))
+        for chunk_size in (1, 7, 4096):
+            for incremental in (True, False):
+                response, captured, _, _ = self._stream(
+                    chunk_size, incremental, stream, max_captured_body_bytes=256
+                )
+                assert response.content == stream
+                assert captured.body == expected
+                assert captured.raw_body_size == len(stream)
+                assert captured.raw_body.startswith(stream[:256].decode())
+                assert captured.raw_body.endswith(
+                    f"...[truncated {len(stream) - 256} bytes]"
+                )
+
+    def test_compressed_stream_is_relayed_decoded(self):
+        """A gzip stream reaches the client decoded, without framing headers."""
+        compressed = gzip.compress(self.STREAM)
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                headers={
+                    "content-type": "text/event-stream",
+                    "content-encoding": "gzip",
+                    "cache-control": "no-cache",
+                    "content-length": str(len(compressed)),
+                },
+                content=compressed,
+            )
+
+        for log_requests in (True, False):
+            server, _, _ = _make_server(upstream, log_requests=log_requests)
+            payload = {"model": "x", "messages": [], "stream": True}
+            response = asyncio.run(_post(server, payload))
+            assert "content-encoding" not in response.headers
+            assert response.headers["cache-control"] == "no-cache"
+            assert "content-length" not in response.headers
+            assert response.content == self.STREAM
+            if log_requests:
+                assert server.get_requests()[0].response.body == "Hello é"
+
+    def test_streamed_error_body_is_read_bounded(self):
+        """A failed streaming attempt quotes only a prefix of its error body."""
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            if json.loads(request.content)["model"] == "bad/model":
+                return httpx.Response(500, content=b"e" * 1_000_000)
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=self.STREAM
+            )
+
+        server, _, _ = _make_server(
+            upstream, openrouter_api_models=["bad/model", "test/model"]
+        )
+        payload = {"model": "x", "messages": [], "stream": True}
+        response = asyncio.run(_post(server, payload))
+
+        assert response.content == self.STREAM
+        failed = server.get_requests()[0].model_invocations[0]
+        assert failed.error_message.endswith("...[truncated]")
+        assert len(failed.error_message) < 4096
+
+    def test_stream_passes_through_when_logging_is_off(self):
+        """With log_requests off the stream is relayed and nothing is kept."""
+        stream = b"data: " + _delta("hi") + b"\n\ndata: [DONE]\n\n"
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=stream
+            )
+
+        server, intercepts, updates = _make_server(upstream, log_requests=False)
+        payload = {"model": "x", "messages": [], "stream": True}
+        response = asyncio.run(_post(server, payload))
+        server._drain_ui_queue()
+
+        assert response.status_code == 200
+        assert response.content == stream
+        assert server.get_requests() == []
+        assert intercepts == updates == []
+
+
+class TestServerLifecycle:
+    """Test cases for starting and stopping the uvicorn server."""
+
+    def test_start_waits_until_listening(self):
+        """start() returns once the port accepts connections."""
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = ProxyServer(ProxyConfig(port=port, openrouter_api_keys=["sk-or-t"]))
+
+        async def run():
+            await server.start()
+            try:
+                assert server.is_running
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(f"http://127.0.0.1:{port}/")
+                assert response.status_code == 200
+            finally:
+                await server.stop()
+
+        asyncio.run(run())
+        assert not server.is_running
+
+    def test_h11_is_used_without_httptools(self):
+        """The server still starts its protocol where httptools is missing."""
+        code = (
+            "import sys; sys.modules['httptools'] = None\n"
+            "from proxy_interceptor import proxy_server\n"
+            "print(proxy_server._HttpProtocol)"
+        )
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "h11"
+
+
+class TestStreamingUpdates:
+    """Test cases for intermediate streaming updates sent to the UI."""
+
+    def test_updates_are_rate_limited(self):
+        """A burst of deltas produces a handful of updates, not one per delta."""
+        events = [b"data: " + _delta(str(i % 10)) + b"\n\n" for i in range(500)]
+
+        async def chunks():
+            for event in events:
+                yield event
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=chunks()
+            )
+
+        server, _, updates = _make_server(upstream)
+        payload = {"model": "x", "messages": [], "stream": True}
+        asyncio.run(_post(server, payload))
+        server._drain_ui_queue()
+
+        assert 2 <= len(updates) < 50
+        assert updates[-1].response.streaming_complete
+        assert updates[-1].response.body == "0123456789" * 50
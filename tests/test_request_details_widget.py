@@ -0,0 +1,175 @@
+# tests/test_request_details_widget.py
+import json
+from datetime import datetime
+
+from PyQt6.QtCore import QThreadPool
+
+from proxy_interceptor.models import HttpRequest, HttpResponse, InterceptedRequest
+from proxy_interceptor.request_details_widget import (
+    ASYNC_FORMAT_CHARS,
+    FAST_FLUSH_MS,
+    FORMAT_CACHE_SIZE,
+    MAX_FLUSH_INTERVAL_MS,
+    MIN_FLUSH_INTERVAL_MS,
+    SLOW_FLUSH_MS,
+    RequestDetailsWidget,
+    _format_body,
+)
+
+SOAP_BODY = (
+    '<?xml version="1.0"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<!-- sent by the client -->"
+    '<?audit level="full"?>'
+    "<soap:Body><answer>42</answer></soap:Body>"
+    "</soap:Envelope>"
+)
+
+
+class TestFormatBody:
+    """Test cases for pretty-printing bodies by content type."""
+
+    def test_xml_keeps_prefixes_and_comments(self):
+        """Namespaced XML is indented without rewriting what was sent."""
+        formatted = _format_body(SOAP_BODY, "text/xml; charset=utf-8")
+
+        assert "<soap:Envelope" in formatted
+        assert "<soap:Body>" in formatted
+        assert "ns0:" not in formatted
+        assert "<!-- sent by the client -->" in formatted
+        assert '<?audit level="full"?>' in formatted
+        assert "\n    <answer>42</answer>\n" in formatted
+
+    def test_unparseable_xml_is_shown_as_is(self):
+        """A body that is not well-formed falls back to the raw text."""
+        assert _format_body("<a><b></a>", "application/xml") == "<a><b></a>"
+
+
+def _make_request(
+    request_body: str,
+    response_body: str = "",
+    content_type: str = "application/json",
+    **response_fields,
+) -> InterceptedRequest:
+    headers = {"Content-Type": content_type}
+    request = HttpRequest(
+        datetime(2026, 1, 1, 12, 0, 0),
+        "POST",
+        "http://127.0.0.1:8080/v1/chat/completions",
+        headers,
+        request_body,
+    )
+    response = HttpResponse(200, "OK", headers, response_body, **response_fields)
+    return InterceptedRequest(request=request, response=response)
+
+
+def _large_json() -> str:
+    body = json.dumps({"messages": [{"content": "x" * 10}] * 4000})
+    assert len(body) >= ASYNC_FORMAT_CHARS
+    return body
+
+
+def _make_widget(qtbot) -> RequestDetailsWidget:
+    widget = RequestDetailsWidget()
+    qtbot.addWidget(widget)
+    return widget
+
+
+class TestRequestDetailsWidget:
+    """Test cases for how the details view renders request and response bodies."""
+
+    def test_small_bodies_are_formatted_immediately(self, qtbot):
+        """JSON bodies are shown indented as soon as the request is selected."""
+        widget = _make_widget(qtbot)
+        widget.set_request(_make_request('{"a": 1}', '{"b": [2]}'))
+
+        assert widget.request_body.toPlainText() == '{\n  "a": 1\n}'
+        assert widget.response_body_parsed.toPlainText() == '{\n  "b": [\n    2\n  ]\n}'
+
+    def test_format_cache_is_keyed_on_content_type(self, qtbot):
+        """The same body under another content type is not served from cache."""
+        widget = _make_widget(qtbot)
+        widget.set_request(_make_request('{"a": 1}'))
+        widget.set_request(_make_request('{"a": 1}', content_type="text/plain"))
+
+        assert widget.request_body.toPlainText() == '{"a": 1}'
+
+    def test_format_cache_evicts_the_oldest_body(self, qtbot):
+        """The cache holds at most FORMAT_CACHE_SIZE bodies, dropping the oldest."""
+        widget = _make_widget(qtbot)
+        for i in range(FORMAT_CACHE_SIZE + 1):
+            widget.set_request(_make_request(f'{{"i": {i}}}'))
+
+        assert len(widget._format_cache) <= FORMAT_CACHE_SIZE
+        assert ('{"i": 0}', "application/json") not in widget._format_cache
+        assert (
+            f'{{"i": {FORMAT_CACHE_SIZE}}}',
+            "application/json",
+        ) in widget._format_cache
+
+    def test_raw_tab_is_filled_when_opened(self, qtbot):
+        """The raw body is only rendered once its tab is shown."""
+        widget = _make_widget(qtbot)
+        widget.set_request(_make_request("{}", "hello", raw_body="raw hello"))
+        assert widget.response_body_raw.toPlainText() == ""
+
+        widget.response_body_tabs.setCurrentWidget(widget.response_body_raw)
+        assert widget.response_body_raw.toPlainText() == "raw hello"
+
+    def test_large_body_is_formatted_on_the_thread_pool(self, qtbot):
+        """A large body shows a placeholder until the worker's result arrives."""
+        widget = _make_widget(qtbot)
+        body = _large_json()
+        widget.set_request(_make_request(body))
+        assert widget.request_body.toPlainText().startswith("[Formatting ")
+
+        expected = _format_body(body, "application/json")
+        qtbot.waitUntil(
+            lambda: widget.request_body.toPlainText() == expected, timeout=5000
+        )
+
+    def test_stale_format_result_is_ignored(self, qtbot):
+        """A result for a body no longer shown does not overwrite the view."""
+        widget = _make_widget(qtbot)
+        widget.set_request(_make_request(_large_json()))
+        widget.set_request(_make_request('{"a": 1}'))
+
+        qtbot.waitUntil(lambda: not widget._format_jobs, timeout=5000)
+        assert widget.request_body.toPlainText() == '{\n  "a": 1\n}'
+
+    def test_format_result_after_clear_is_dropped(self, qtbot):
+        """Clearing the view discards work still running on the thread pool."""
+        widget = _make_widget(qtbot)
+        widget.set_request(_make_request(_large_json()))
+        widget.clear()
+
+        QThreadPool.globalInstance().waitForDone(5000)
+        qtbot.wait(50)
+        assert widget.request_body.toPlainText() == ""
+        assert not widget._format_cache
+
+    def test_streaming_text_is_appended(self, qtbot):
+        """Streamed text grows in place and ends up exactly as received."""
+        widget = _make_widget(qtbot)
+        request = _make_request("{}", is_streaming=True)
+        widget.set_request(request)
+
+        for content in ("Hel", "Hello, ", "Hello, world"):
+            request.response.streaming_content = content
+            widget.update_streaming_content(request)
+            qtbot.waitUntil(
+                lambda c=content: widget.response_body_parsed.toPlainText() == c,
+                timeout=2000,
+            )
+        assert widget.response_title.text().endswith("(streaming: 12 chars)")
+
+    def test_flush_interval_adapts_to_flush_cost(self, qtbot):
+        """Slow flushes back off to the maximum and fast ones speed up."""
+        widget = _make_widget(qtbot)
+        for _ in range(10):
+            widget._adapt_flush_interval(SLOW_FLUSH_MS + 1)
+        assert widget._flush_timer.interval() == MAX_FLUSH_INTERVAL_MS
+
+        for _ in range(10):
+            widget._adapt_flush_interval(FAST_FLUSH_MS / 2)
+        assert widget._flush_timer.interval() == MIN_FLUSH_INTERVAL_MS
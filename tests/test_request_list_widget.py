@@ -0,0 +1,85 @@
+# tests/test_request_list_widget.py
+from datetime import datetime, timedelta
+
+from PyQt6.QtCore import QModelIndex, Qt
+
+from proxy_interceptor.models import HttpRequest, HttpResponse, InterceptedRequest
+from proxy_interceptor.request_list_widget import (
+    RequestListModel,
+    RequestListWidget,
+)
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _make_request(i: int, **response_fields) -> InterceptedRequest:
+    """Create a logged request whose timestamp is offset by i seconds."""
+    request = HttpRequest(
+        START + timedelta(seconds=i),
+        "POST",
+        "http://127.0.0.1:8080/v1/chat/completions",
+        {},
+        f'{{"model": "test/model-{i}"}}',
+    )
+    response = HttpResponse(200, "OK", {}, "", **response_fields)
+    return InterceptedRequest(request=request, response=response)
+
+
+class TestRequestListModel:
+    """Test cases for the model backing the request list."""
+
+    def test_every_request_is_a_row_without_fetching(self):
+        """Rows are exposed as soon as they are set or appended."""
+        model = RequestListModel()
+        model.set_requests([_make_request(i) for i in range(500)])
+        assert model.rowCount() == 500
+        assert not model.canFetchMore(QModelIndex())
+
+        model.append_requests([_make_request(i) for i in range(500, 510)])
+        assert model.rowCount() == 510
+        assert not model.canFetchMore(QModelIndex())
+        model.fetchMore(QModelIndex())
+        assert model.rowCount() == 510
+
+    def test_rows_are_labelled_with_model_and_stats(self):
+        """The label names the model and, once complete, latency and tokens."""
+        model = RequestListModel()
+        model.append_requests([_make_request(0, latency_ms=12.4, total_tokens=7)])
+        label = model.index(0).data()
+        assert label == (
+            "[12:00:00] POST /v1/chat/completions - test/model-0  (12ms, tok:7)"
+        )
+        assert model.index(0).data(Qt.ItemDataRole.UserRole).request.timestamp == START
+
+    def test_update_replaces_the_row_and_its_label(self, qtbot):
+        """An update for a listed request relabels it; others are ignored."""
+        model = RequestListModel()
+        model.append_requests([
+            _make_request(0, is_streaming=True, streaming_content="ab")
+        ])
+        assert model.index(0).data().endswith("(streaming: 2 chars)")
+
+        updated = _make_request(0, is_streaming=True, streaming_content="abcd")
+        with qtbot.waitSignal(model.dataChanged):
+            assert model.update_request(updated)
+        assert model.index(0).data().endswith("(streaming: 4 chars)")
+        assert not model.update_request(_make_request(1))
+
+
+class TestRequestListWidget:
+    """Test cases for batching and auto-follow in the request list."""
+
+    def test_auto_follow_selects_the_newest_request_once(self, qtbot):
+        """A batch of new requests selects only the newest, emitting once."""
+        widget = RequestListWidget()
+        qtbot.addWidget(widget)
+        selected = []
+        widget.request_selected.connect(selected.append)
+
+        requests = [_make_request(i) for i in range(3)]
+        for request in requests:
+            widget.add_request(request)
+        qtbot.waitUntil(lambda: widget.model.rowCount() == 3, timeout=1000)
+
+        assert selected == [requests[-1]]
+        assert widget.request_list.currentIndex().row() == 2